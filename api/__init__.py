@@ -0,0 +1,58 @@
+import importlib
+
+# Submodules and re-exported names are loaded on first use (PEP 562), so
+# `import api` costs next to nothing and a process only pays for what it touches.
+
+# Every submodule of the package.
+_SUBMODULES = {
+    "analytics", "archive", "batch", "blizzard", "drinks", "food", "instrument",
+    "intake", "journal", "loader", "loadgen", "orders", "pool", "pricing", "registry", "scheduler", "settlement",
+}
+
+# Public names available straight from the package, mapped to their submodule.
+_EXPORTS = {
+    "Order": "orders",
+    "Drink": "drinks", "DrinkBase": "drinks", "Flavor": "drinks", "FrozenDrink": "drinks", "Size": "drinks",
+    "Food": "food", "Foods": "food", "FrozenFood": "food", "Topping": "food",
+    "Blizzard": "blizzard", "BlizzardFlavor": "blizzard", "BlizzardTopping": "blizzard", "FrozenBlizzard": "blizzard",
+    "PriceIndex": "pricing", "PriceTable": "pricing", "price_index": "pricing", "price_many": "pricing",
+    "OrderBatch": "batch",
+    "ArchiveReader": "archive", "ArchiveWriter": "archive", "write_archive": "archive",
+    "LineError": "loader", "OrderLoader": "loader",
+    "LoadGenerator": "loadgen", "TrafficMix": "loadgen", "run_trace": "loadgen",
+    "Settlement": "settlement", "settle": "settlement", "settle_archives": "settlement",
+    "IntakeService": "intake",
+    "Journal": "journal", "replay": "journal",
+    "OrderRegistry": "registry",
+    "KitchenScheduler": "scheduler",
+    "SalesRollup": "analytics", "rollup_archives": "analytics",
+}
+
+__all__ = sorted(_EXPORTS)
+
+# Load a submodule or re-exported name the first time it is asked for.
+def __getattr__(name):
+    """
+    Imports a submodule, or the submodule that defines a re-exported name, on first access.
+
+    Args:
+        name (str): The attribute being looked up (e.g. "orders" or "Order").
+
+    Returns:
+        The submodule or the re-exported object.
+
+    Raises:
+        AttributeError: If the package has no such submodule or name.
+    """
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    # Later lookups find it directly and skip this function.
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_EXPORTS))
@@ -0,0 +1,262 @@
+from array import array
+
+from .archive import ArchiveReader
+from .batch import KIND_OF, KINDS
+from .loader import KIND_NAMES
+from .pool import run_tasks
+from .pricing import TABLES, to_dollars
+
+# Create class "KindTotals"
+class KindTotals:
+    """
+    Sales counters for one kind of item.
+
+    Every counter is an array indexed by ordinal, so its size is fixed by the
+    menu no matter how many orders are added.
+
+    Attributes:
+        items (int): The number of items sold.
+        cents (int): Their total price in cents.
+        base_items (array): The number of items sold with each base, by base ordinal.
+        base_cents (array): The sales of each base in cents, by base ordinal.
+        topping_items (array): The number of items sold with each topping (or flavor), by ordinal.
+        size_items (array): The number of items sold in each size, by size ordinal. Kinds without sizes have one slot.
+        size_cents (array): The sales of each size in cents, by size ordinal.
+    """
+    __slots__ = ("items", "cents", "base_items", "base_cents", "topping_items", "size_items", "size_cents")
+
+    def __init__(self, bases, toppings, sizes):
+        """
+        Initializes every counter at zero.
+
+        Args:
+            bases (int): The number of base ordinals.
+            toppings (int): The number of topping or flavor ordinals.
+            sizes (int): The number of size ordinals.
+        """
+        self.items = 0
+        self.cents = 0
+        self.base_items = array("q", bytes(8 * bases))
+        self.base_cents = array("q", bytes(8 * bases))
+        self.topping_items = array("q", bytes(8 * toppings))
+        self.size_items = array("q", bytes(8 * sizes))
+        self.size_cents = array("q", bytes(8 * sizes))
+
+    # Fold another kind's counters into these.
+    def merge(self, other):
+        """
+        Adds another set of counters for the same kind into this one.
+
+        Args:
+            other (KindTotals): The counters to fold in.
+        """
+        self.items += other.items
+        self.cents += other.cents
+        for mine, theirs in ((self.base_items, other.base_items), (self.base_cents, other.base_cents),
+                             (self.topping_items, other.topping_items), (self.size_items, other.size_items),
+                             (self.size_cents, other.size_cents)):
+            for i, count in enumerate(theirs):
+                mine[i] += count
+
+# Create class "SalesRollup"
+class SalesRollup:
+    """
+    Streaming sales totals by base, topping attach rate and drink size.
+
+    Orders are added one at a time and only counters are kept, so a rollup
+    over months of orders takes the same memory as one over a single order.
+    Rollups built by separate workers combine exactly with `merge`.
+
+    Attributes:
+        orders (int): The number of orders added.
+        kinds (list): The `KindTotals` of each item kind, indexed like `batch.KINDS`.
+    """
+
+    def __init__(self):
+        """Initializes an empty rollup."""
+        self.orders = 0
+        self.kinds = []
+        for base, toppings, size in (cls._price_tables for cls in KINDS):
+            sizes = len(TABLES[size].members) if size is not None else 1
+            self.kinds.append(KindTotals(len(TABLES[base].members), len(TABLES[toppings].members), sizes))
+
+    # Count one item from its packed form.
+    def _add(self, kind, base, mask, size, cents):
+        totals = self.kinds[kind]
+        totals.items += 1
+        totals.cents += cents
+        totals.base_items[base] += 1
+        totals.base_cents[base] += cents
+        totals.size_items[size] += 1
+        totals.size_cents[size] += cents
+        toppings = totals.topping_items
+        while mask:
+            low = mask & -mask
+            toppings[low.bit_length() - 1] += 1
+            mask ^= low
+
+    # Add one order.
+    def add(self, order):
+        """
+        Adds an order's items, priced with `calculate_cost_cents`.
+
+        Args:
+            order (Order): The order to add.
+
+        Raises:
+            ValueError: If the order holds something other than a `Drink`, `Food`, or `Blizzard`.
+        """
+        self.orders += 1
+        for item in order.get_items():
+            kind = KIND_OF.get(type(item))
+            if kind is None:
+                raise ValueError("Only drinks, food, or Blizzards can be rolled up.")
+            self._add(kind, *item._encode(), item.calculate_cost_cents())
+
+    # Add orders from any iterator, one at a time.
+    def add_orders(self, orders):
+        """
+        Adds every order from an iterable in one pass, without holding on to any of them.
+
+        Args:
+            orders (iterable): The `Order` objects to add, e.g. a generator or `OrderLoader.load` results.
+
+        Returns:
+            SalesRollup: This rollup.
+        """
+        for order in orders:
+            self.add(order)
+        return self
+
+    # Add a batch's rows without building objects.
+    def add_batch(self, batch):
+        """
+        Adds every order in an `OrderBatch`, using its stored prices and without rebuilding any items.
+
+        Args:
+            batch (OrderBatch): The orders to add.
+        """
+        self.orders += len(batch)
+        add = self._add
+        for row in zip(batch.kinds, batch.bases, batch.masks, batch.sizes, batch.get_cents()):
+            add(*row)
+
+    # Add an archive's records without building objects.
+    def add_archive(self, archive, start=0, stop=None):
+        """
+        Adds a range of orders from a binary archive straight from its records.
+
+        Args:
+            archive (ArchiveReader): The open archive.
+            start (int): The first order to add.
+            stop (int): One past the last order to add. Defaults to the end of the archive.
+        """
+        stop = len(archive) if stop is None else min(stop, len(archive))
+        add = self._add
+        for index in range(start, stop):
+            self.orders += 1
+            for record in archive.iter_items(index):
+                add(*record)
+
+    # Fold another rollup into this one.
+    def merge(self, other):
+        """
+        Adds another rollup's counters into this one.
+
+        Args:
+            other (SalesRollup): The partial rollup to fold in.
+
+        Returns:
+            SalesRollup: This rollup.
+        """
+        self.orders += other.orders
+        for mine, theirs in zip(self.kinds, other.kinds):
+            mine.merge(theirs)
+        return self
+
+    # Return the grand total.
+    def get_total_cents(self):
+        """
+        Returns the total sales across every kind.
+
+        Returns:
+            int: The total in cents.
+        """
+        return sum(totals.cents for totals in self.kinds)
+
+    # Return how often a topping is ordered.
+    def get_attach_rate(self, kind, topping):
+        """
+        Returns the share of items of a kind that were sold with a topping or flavor.
+
+        Args:
+            kind (int): The item kind (e.g. `batch.KIND_FOOD`).
+            topping (Enum or str): The topping or flavor.
+
+        Returns:
+            float: The attach rate between 0.0 and 1.0, or 0.0 if no item of that kind was sold.
+
+        Raises:
+            ValueError: If the topping does not belong to that kind.
+        """
+        i = TABLES[KINDS[kind]._price_tables[1]].ordinal(topping)
+        if i is None:
+            raise ValueError(f"{topping!r} is not a topping or flavor of {KIND_NAMES[KINDS[kind]]}.")
+        totals = self.kinds[kind]
+        return totals.topping_items[i] / totals.items if totals.items else 0.0
+
+    # Return the totals with member names instead of ordinals.
+    def to_dict(self):
+        """
+        Returns every counter keyed by name, leaving out anything that never sold.
+
+        Returns:
+            dict: {"orders", "items", "total", "kinds"}, where "kinds" maps each kind name to
+            {"items", "total", "bases", "toppings", "sizes"}. "bases" and "sizes" map each name to
+            (items, cents); "toppings" maps each topping or flavor to (items, attach rate).
+        """
+        kinds = {}
+        for cls, totals in zip(KINDS, self.kinds):
+            base, toppings, size = (TABLES[name].values if name is not None else (None,) for name in cls._price_tables)
+            kinds[KIND_NAMES[cls]] = {
+                "items": totals.items,
+                "total": to_dollars(totals.cents),
+                "bases": {base[i]: (count, totals.base_cents[i]) for i, count in enumerate(totals.base_items) if count},
+                "toppings": {toppings[i]: (count, count / totals.items) for i, count in enumerate(totals.topping_items) if count},
+                "sizes": {size[i]: (count, totals.size_cents[i]) for i, count in enumerate(totals.size_items) if count and size[i] is not None},
+            }
+        return {
+            "orders": self.orders,
+            "items": sum(totals.items for totals in self.kinds),
+            "total": to_dollars(self.get_total_cents()),
+            "kinds": kinds,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, SalesRollup) and self.to_dict() == other.to_dict()
+
+# Roll up one binary archive; runs in the worker processes.
+def _rollup_archive(path):
+    rollup = SalesRollup()
+    with ArchiveReader(path) as archive:
+        rollup.add_archive(archive)
+    return rollup
+
+# Roll up many binary archives across a process pool.
+def rollup_archives(paths, workers=None, max_pending=None):
+    """
+    Rolls up binary order archives (see `archive`), reading each file in a worker process.
+
+    Only file paths and the fixed-size partial rollups cross between processes.
+
+    Args:
+        paths (iterable): The archive files, e.g. one per day.
+        workers (int): The number of worker processes. Defaults to the number of CPUs; 0 rolls up in this process.
+        max_pending (int): The number of files allowed in flight. Defaults to twice the number of workers.
+
+    Returns:
+        SalesRollup: The merged rollup.
+    """
+    rollup = SalesRollup()
+    run_tasks(((_rollup_archive, path) for path in paths), workers, max_pending, rollup.merge)
+    return rollup
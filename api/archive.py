@@ -0,0 +1,264 @@
+import mmap
+import struct
+
+from .batch import KIND_OF, KINDS, OrderBatch
+from .orders import Order
+
+# File layout, all little-endian:
+#   header: magic, version, reserved, order count, item count
+#   items:  one fixed-width record per line item, orders stored back to back
+#   index:  the first item of each order, then the item count (order count + 1 entries)
+MAGIC = b"SPOA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+# kind, base ordinal, topping/flavor bitmask, size ordinal, price in cents
+ITEM = struct.Struct("<BBHBi")
+INDEX = struct.Struct("<Q")
+
+# Create class "ArchiveWriter"
+class ArchiveWriter:
+    """
+    Writes orders to a binary archive file, one fixed-width record per item.
+
+    Use it as a context manager, or call `close` when done; the order index
+    and final counts are written on close.
+
+    Attributes:
+        path (str): The archive being written.
+    """
+
+    def __init__(self, path):
+        """
+        Creates (or overwrites) an archive file.
+
+        Args:
+            path (str): The file to write.
+        """
+        self.path = path
+        self._fp = open(path, "wb")
+        self._fp.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self._starts = [0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Append one order.
+    def write(self, order):
+        """
+        Appends an order to the archive.
+
+        Args:
+            order (Order): The order to write.
+
+        Raises:
+            ValueError: If the order holds something other than a `Drink`, `Food`, or `Blizzard`.
+        """
+        pack = ITEM.pack
+        records = []
+        for item in order.get_items():
+            kind = KIND_OF.get(type(item))
+            if kind is None:
+                raise ValueError("An archive can only hold drinks, food, or Blizzards.")
+            records.append(pack(kind, *item._encode(), item.calculate_cost_cents()))
+        self._fp.write(b"".join(records))
+        self._starts.append(self._starts[-1] + len(records))
+
+    # Append many orders.
+    def write_all(self, orders):
+        """
+        Appends several orders to the archive.
+
+        Args:
+            orders (iterable): The `Order` objects to write.
+        """
+        for order in orders:
+            self.write(order)
+
+    # Write the index and counts, then close the file.
+    def close(self):
+        """Writes the order index and the header counts, then closes the file."""
+        if self._fp.closed:
+            return
+        self._fp.write(b"".join(INDEX.pack(start) for start in self._starts))
+        self._fp.seek(0)
+        self._fp.write(HEADER.pack(MAGIC, VERSION, 0, len(self._starts) - 1, self._starts[-1]))
+        self._fp.close()
+
+# Write a whole archive in one call.
+def write_archive(path, orders):
+    """
+    Writes orders to a new binary archive.
+
+    Args:
+        path (str): The file to write.
+        orders (iterable): The `Order` objects to write.
+    """
+    with ArchiveWriter(path) as writer:
+        writer.write_all(orders)
+
+# Create class "ArchiveReader"
+class ArchiveReader:
+    """
+    Reads a binary archive through `mmap`, decoding only the orders asked for.
+
+    Opening an archive reads just the header, so it takes the same time for
+    any file size. Order `n` is found through the index in O(1).
+
+    Attributes:
+        path (str): The archive being read.
+    """
+
+    def __init__(self, path):
+        """
+        Opens an archive.
+
+        Args:
+            path (str): The file to read.
+
+        Raises:
+            ValueError: If the file is not a complete archive this version can read.
+        """
+        self.path = path
+        with open(path, "rb") as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is too short to be an order archive.")
+        magic, version, _, self._orders, self._items = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} order archive.")
+        self._index = HEADER.size + self._items * ITEM.size
+        if len(self._map) != self._index + (self._orders + 1) * INDEX.size:
+            self.close()
+            raise ValueError(f"{path} is truncated or was not closed properly.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Release the memory map.
+    def close(self):
+        """Closes the archive."""
+        self._map.close()
+
+    # Return the number of orders.
+    def __len__(self):
+        """
+        Returns the number of orders in the archive.
+
+        Returns:
+            int: The number of orders.
+        """
+        return self._orders
+
+    # Return the number of line items.
+    def get_num_items(self):
+        """
+        Returns the number of line items across every order.
+
+        Returns:
+            int: The number of line items.
+        """
+        return self._items
+
+    # Return the first and past-the-end item of an order.
+    def _span(self, index):
+        if not 0 <= index < self._orders:
+            raise IndexError("Invalid index, no such order in the archive.")
+        offset = self._index + index * INDEX.size
+        return INDEX.unpack_from(self._map, offset)[0], INDEX.unpack_from(self._map, offset + INDEX.size)[0]
+
+    # Yield one order's raw records.
+    def iter_items(self, index):
+        """
+        Yields the raw records of the order at an index, without building any objects.
+
+        Args:
+            index (int): The index of the order.
+
+        Yields:
+            tuple: (kind, base ordinal, bitmask, size ordinal, cents) for each item.
+
+        Raises:
+            IndexError: If the index is invalid.
+        """
+        start, end = self._span(index)
+        yield from ITEM.iter_unpack(self._map[HEADER.size + start * ITEM.size:HEADER.size + end * ITEM.size])
+
+    # Return one order's total.
+    def get_order_cents(self, index):
+        """
+        Returns the stored total of the order at an index.
+
+        Args:
+            index (int): The index of the order.
+
+        Returns:
+            int: The order's total in cents.
+        """
+        return sum(record[4] for record in self.iter_items(index))
+
+    # Rebuild one order.
+    def get_order(self, index):
+        """
+        Rebuilds the order at an index as an `Order` object.
+
+        Args:
+            index (int): The index of the order.
+
+        Returns:
+            Order: The rebuilt order.
+
+        Raises:
+            IndexError: If the index is invalid.
+        """
+        order = Order()
+        for kind, base, mask, size, _ in self.iter_items(index):
+            order.add_item(KINDS[kind]._decode(base, mask, size))
+        return order
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._orders
+        return self.get_order(index)
+
+    # Rebuild every order, one at a time.
+    def iter_orders(self):
+        """
+        Rebuilds every order in the archive, in the order they were written.
+
+        Yields:
+            Order: The next rebuilt order.
+        """
+        for index in range(self._orders):
+            yield self.get_order(index)
+
+    # Load orders into columns without building objects.
+    def to_batch(self, start=0, stop=None):
+        """
+        Loads a range of orders into an `OrderBatch` without building any `Order` objects.
+
+        Args:
+            start (int): The first order to load.
+            stop (int): One past the last order to load. Defaults to the end of the archive.
+
+        Returns:
+            OrderBatch: The orders' rows.
+        """
+        stop = self._orders if stop is None else min(stop, self._orders)
+        batch = OrderBatch()
+        for index in range(start, stop):
+            for kind, base, mask, size, cents in self.iter_items(index):
+                batch.kinds.append(kind)
+                batch.bases.append(base)
+                batch.masks.append(mask)
+                batch.sizes.append(size)
+                batch.cents.append(cents)
+            batch.offsets.append(len(batch.kinds))
+        return batch
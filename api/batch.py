@@ -0,0 +1,246 @@
+from array import array
+from itertools import islice
+
+from .blizzard import Blizzard, FrozenBlizzard
+from .drinks import Drink, FrozenDrink
+from .food import Food, FrozenFood
+from .orders import Order
+from .pricing import COST_CACHE, price_index
+
+# Item kinds, as stored in the `kinds` column.
+KIND_FOOD = 0
+KIND_DRINK = 1
+KIND_BLIZZARD = 2
+
+# The item class for each kind, indexed by kind.
+KINDS = (Food, Drink, Blizzard)
+# The kind of each item class, frozen classes included.
+KIND_OF = {cls: kind for kind, cls in enumerate(KINDS)}
+KIND_OF.update({FrozenFood: KIND_FOOD, FrozenDrink: KIND_DRINK, FrozenBlizzard: KIND_BLIZZARD})
+
+# Create class "OrderBatch"
+class OrderBatch:
+    """
+    A columnar store for many orders' line items.
+
+    Every line item is one row across the parallel item columns. Orders are
+    contiguous runs of rows; order `n` spans rows `offsets[n]` to `offsets[n + 1]`.
+
+    Attributes:
+        kinds (array): The kind of each item (`KIND_FOOD`, `KIND_DRINK` or `KIND_BLIZZARD`).
+        bases (array): The ordinal of each item's base in its kind's base table.
+        masks (array): Each item's topping or flavor bitmask.
+        sizes (array): The ordinal of each item's `Size` (always 0 for food and Blizzards).
+        cents (array): The price of each item in cents. Empty in a batch built with `priced=False`; see `get_cents`.
+        offsets (array): The first row of each order, followed by the total number of rows.
+    """
+    __slots__ = ("kinds", "bases", "masks", "sizes", "cents", "offsets")
+
+    def __init__(self):
+        """Initializes an empty batch."""
+        self.kinds = array("B")
+        self.bases = array("B")
+        self.masks = array("H")
+        self.sizes = array("B")
+        self.cents = array("l")
+        self.offsets = array("q", [0])
+
+    # Build a batch from several orders.
+    @classmethod
+    def from_orders(cls, orders, priced=True):
+        """
+        Builds a batch holding every item of several orders.
+
+        Args:
+            orders (iterable): The `Order` objects to store.
+            priced (bool): Whether to fill the `cents` column. See `append`.
+
+        Returns:
+            OrderBatch: The new batch.
+        """
+        batch = cls()
+        batch.extend(orders, priced)
+        return batch
+
+    # Return the number of orders in the batch.
+    def __len__(self):
+        """
+        Returns the number of orders in the batch.
+
+        Returns:
+            int: The number of orders.
+        """
+        return len(self.offsets) - 1
+
+    # Return the number of line items in the batch.
+    def get_num_items(self):
+        """
+        Returns the number of line items across every order in the batch.
+
+        Returns:
+            int: The number of line items.
+        """
+        return len(self.kinds)
+
+    # Add one order to the end of the batch.
+    def append(self, order, priced=True):
+        """
+        Adds every item of an order to the end of the batch.
+
+        Args:
+            order (Order): The order to add.
+            priced (bool): Whether to fill the `cents` column. Leave it off when the rows will only be priced
+                with `price`, e.g. in another process; `cents` then stays empty until `get_cents` fills it.
+
+        Raises:
+            ValueError: If the order holds something other than a `Drink`, `Food`, or `Blizzard`.
+        """
+        self.extend((order,), priced)
+
+    # Add several orders to the end of the batch.
+    def extend(self, orders, priced=True):
+        """
+        Adds every item of several orders to the end of the batch.
+
+        Args:
+            orders (iterable): The `Order` objects to add.
+            priced (bool): Whether to fill the `cents` column. See `append`.
+
+        Raises:
+            ValueError: If an order holds something other than a `Drink`, `Food`, or `Blizzard`.
+        """
+        # Bound once per call; this loop is what `settle` runs for every item.
+        kind_of = KIND_OF.get
+        kinds, bases, masks, sizes = self.kinds.append, self.bases.append, self.masks.append, self.sizes.append
+        cents = self.cents.append
+        offsets = self.offsets
+        rows = len(self.kinds)
+        for order in orders:
+            for item in order.get_items():
+                kind = kind_of(type(item))
+                if kind is None:
+                    raise ValueError("A batch can only hold drinks, food, or Blizzards.")
+                base, mask, size = item._encode()
+                kinds(kind)
+                bases(base)
+                masks(mask)
+                sizes(size)
+                if priced:
+                    cents(item.calculate_cost_cents())
+                rows += 1
+            offsets.append(rows)
+
+    # Rebuild one order from its rows.
+    def get_order(self, index):
+        """
+        Rebuilds the order at an index as an `Order` object.
+
+        Args:
+            index (int): The index of the order in the batch.
+
+        Returns:
+            Order: A new order with the same items as the one stored.
+
+        Raises:
+            IndexError: If the index is invalid.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("Invalid index, no such order in the batch.")
+        order = Order()
+        for row in range(self.offsets[index], self.offsets[index + 1]):
+            order.add_item(KINDS[self.kinds[row]]._decode(self.bases[row], self.masks[row], self.sizes[row]))
+        return order
+
+    # Rebuild every order, one at a time.
+    def iter_orders(self):
+        """
+        Rebuilds every order in the batch, in the order they were added.
+
+        Every row is priced first in one pass with `price`, so the rebuilt items
+        start out with their cost known rather than each pricing itself.
+
+        Yields:
+            Order: The next rebuilt order.
+        """
+        lines = self.price()
+        generation = COST_CACHE.generation
+        decoders = [cls._decode for cls in KINDS]
+        rows = zip(self.kinds, self.bases, self.masks, self.sizes, lines)
+        offsets = self.offsets
+        for index in range(len(self)):
+            order = Order()
+            add = order.add_item
+            for kind, base, mask, size, cents in islice(rows, offsets[index + 1] - offsets[index]):
+                item = decoders[kind](base, mask, size)
+                item._cost = cents
+                item._priced = generation
+                add(item)
+            yield order
+
+    # Return the price column, filling it first if the batch was built unpriced.
+    def get_cents(self):
+        """
+        Returns the price of every row. A batch built with `priced=False` (or extended both ways) is priced with `price` first.
+
+        Returns:
+            array: The `cents` column.
+        """
+        if len(self.cents) != len(self.kinds):
+            self.cents = self.price()
+        return self.cents
+
+    # Return the total of one order.
+    def get_order_cents(self, index):
+        """
+        Returns the total price of the order at an index.
+
+        Args:
+            index (int): The index of the order in the batch.
+
+        Returns:
+            int: The order's total in cents.
+        """
+        return sum(self.get_cents()[self.offsets[index]:self.offsets[index + 1]])
+
+    # Return the total of every order.
+    def get_total_cents(self):
+        """
+        Returns the total price of every item in the batch.
+
+        Returns:
+            int: The total in cents.
+        """
+        return sum(self.get_cents())
+
+    # Price every row from the columns alone.
+    def price(self, prices=None):
+        """
+        Prices every row from its ordinals and bitmask, without rebuilding any items.
+
+        Args:
+            prices (dict): Optional "what-if" changes, mapping a table name (e.g. "food.base") to {member: cents}.
+
+        Returns:
+            array: The price of each row in cents. Without `prices` this equals the `cents` column.
+        """
+        indexes = [price_index(cls._price_tables, prices) for cls in KINDS]
+        lines = array("l")
+        for kind, base, mask, size in zip(self.kinds, self.bases, self.masks, self.sizes):
+            lines.append(indexes[kind].price(base, mask, size))
+        return lines
+
+    # Total each order's rows.
+    def get_order_totals(self, lines=None):
+        """
+        Returns the total of each order.
+
+        Args:
+            lines (array): Optional row prices, e.g. from `price`. Defaults to `get_cents`.
+
+        Returns:
+            array: Each order's total in cents, indexed by order.
+        """
+        if lines is None:
+            lines = self.get_cents()
+        offsets = self.offsets
+        return array("l", (sum(lines[offsets[i]:offsets[i + 1]]) for i in range(len(self))))
@@ -1,5 +1,7 @@
 from enum import Enum
 
+from .pricing import COST_CACHE, PriceTable, to_dollars
+
 class BlizzardFlavor(Enum):
     """
     An enumeration of different Blizzard flavors.
@@ -50,6 +52,25 @@ class BlizzardTopping(Enum):
     MMS = "M&Ms"
     COOKIE_DOUGH = "Cookie Dough"
 
+# Prices, in cents, compiled into flat lookup tables.
+BASE_PRICES = PriceTable("blizzard.base", BlizzardFlavor, {
+    BlizzardFlavor.VANILLA: 300,
+    BlizzardFlavor.CHOCOLATE: 300,
+    BlizzardFlavor.BANANA: 350,
+    BlizzardFlavor.BUTTER_PECAN: 350,
+    BlizzardFlavor.MINT_CHIP: 400,
+    BlizzardFlavor.SMORE: 400,
+})
+TOPPING_PRICES = PriceTable("blizzard.topping", BlizzardTopping, {
+    BlizzardTopping.CARAMEL: 50,
+    BlizzardTopping.CHOCOLATE: 50,
+    BlizzardTopping.PECANS: 50,
+    BlizzardTopping.OREO: 100,
+    BlizzardTopping.KITKAT: 100,
+    BlizzardTopping.MMS: 100,
+    BlizzardTopping.COOKIE_DOUGH: 100,
+})
+
 # Create class "Blizzard"
 class Blizzard:
     """
@@ -57,9 +78,21 @@ class Blizzard:
 
     Attributes:
         _base (str): The base flavor of the Blizzard (e.g., "Vanilla Bean", "S'more"). BlizzardFlavor enums can also be used.
-        _toppings (set): A set of flavors in the drink (e.g., {"Lemon", "Cherry"}).
+        _toppings (int): A bitmask of toppings, with one bit per topping enum (see `TOPPING_PRICES`).
     """
 
+    # No per-instance __dict__; these are the only attributes an instance has.
+    __slots__ = ("_base", "_toppings", "_cost", "_priced", "_orders")
+
+    # The base, topping/flavor and size tables `price_many` prices this class with.
+    _price_tables = ("blizzard.base", "blizzard.topping", None)
+
+    # The slots holding the base, bitmask and size; `price_many` reads them directly.
+    _price_attrs = ("_base", "_toppings", None)
+
+    # Frozen subclasses are immutable and shared; see `freeze`.
+    _frozen = False
+
     _valid_bases = {"vanilla bean", "chocolate", "banana", "butter pecan", "s'more", "mint chocolate chip"}
     _valid_toppings = {"cherry", "whipped cream", "caramel sauce", "chocolate sauce", "oreos", "kitkats", "m&ms", "cookie dough", "pecans"}
 
@@ -68,8 +101,13 @@ class Blizzard:
         Initializes an empty `Blizzard` object.
         """
         self._base = BlizzardFlavor.NULL
-        self._toppings = set()
-        self._cost = 0.00
+        self._toppings = 0
+        # Memoized cost in cents; None until priced or after any change.
+        self._cost = None
+        # The `COST_CACHE.generation` `_cost` was computed under; an older one means a price has changed since.
+        self._priced = -1
+        # The storage of the order holding this Blizzard (see `Order`), or None. Held more than once, it maps each storage to how often it holds the Blizzard.
+        self._orders = None
     
     # Return the _base property.
     def get_base(self):
@@ -89,7 +127,7 @@ class Blizzard:
         Returns:
             list: A list of the Blizzard's toppings.
         """
-        return list(self._toppings)
+        return TOPPING_PRICES.decode(self._toppings)
     
     # Return the number of toppings.
     def get_num_toppings(self):
@@ -99,7 +137,20 @@ class Blizzard:
         Returns:
             int: The number of toppings.
         """
-        return len(self._toppings)
+        return self._toppings.bit_count()
+
+    # Check for a topping with a single bit test.
+    def has_topping(self, topping):
+        """
+        Returns whether the Blizzard has a topping.
+
+        Args:
+            topping (BlizzardTopping): The topping to look for.
+
+        Returns:
+            bool: True if the Blizzard has the topping.
+        """
+        return bool(self._toppings & (TOPPING_PRICES.bit(topping) or 0))
 
     # Set the Blizzard's _base property.
     def set_base(self, base):
@@ -107,15 +158,16 @@ class Blizzard:
         Sets the base of the Blizzard.
 
         Args:
-            base (str): The new base for the Blizzard. Valid bases are any BlizzardFlavor enum value aside from BlizzardFlavor.NULL.
+            base (str): The new base for the Blizzard. Valid bases are any BlizzardFlavor enum value aside from BlizzardFlavor.NULL, or its name (e.g. "Banana").
 
         Raises:
             ValueError: If the base is invalid.
         """
-        if base.value.casefold() in self._valid_bases:
-            self._base = base
-        else:
+        member = BASE_PRICES.lookup(base)
+        if member is None or member is BlizzardFlavor.NULL:
             raise ValueError(f"Pick a proper base from {self._valid_bases}.")
+        self._base = member
+        self._changed()
     
     # Add a topping to the _toppings property.
     def add_topping(self, topping):
@@ -128,10 +180,11 @@ class Blizzard:
         Raises:
             ValueError: If the topping is invalid.
         """
-        if topping.value.casefold() in self._valid_toppings:
-            self._toppings.add(topping.value)
-        else:
+        bit = TOPPING_PRICES.bit(topping)
+        if bit is None:
             raise ValueError(f"Pick a proper topping from {self._valid_toppings}.")
+        self._toppings |= bit
+        self._changed()
 
     # Set the _toppings property to a given list.
     def set_toppings(self, toppings):
@@ -144,13 +197,75 @@ class Blizzard:
         Raises:
             ValueError: If any of the toppings are invalid.
         """
+        mask = 0
         for topping in toppings:
-            if topping.value.casefold() not in self._valid_toppings:
+            bit = TOPPING_PRICES.bit(topping)
+            if bit is None:
                 raise ValueError(f"Pick a proper topping from {self._valid_toppings}.")
-        topping_set = set(toppings)
-        for topping in topping_set:
-            self._toppings.add(topping.value)
+            mask |= bit
+        self._toppings |= mask
+        self._changed()
     
+    def calculate_cost_cents(self):
+        """
+        Calculates and returns the cost of the Blizzard in cents.
+
+        Returns:
+            int: The cost of the Blizzard in cents.
+        """
+        if self._cost is None or self._priced != COST_CACHE.generation:
+            COST_CACHE.misses += 1
+            self._cost = BASE_PRICES.price(self._base) + TOPPING_PRICES.price_mask(self._toppings)
+            self._priced = COST_CACHE.generation
+        else:
+            COST_CACHE.hits += 1
+        return self._cost
+
+    # Drop the cached cost and re-total any order holding the Blizzard.
+    def _changed(self):
+        """
+        Invalidates the cached cost after a change and moves every order holding the Blizzard to its new price.
+        """
+        old = self._cost
+        self._cost = None
+        orders = self._orders
+        if orders is not None:
+            delta = self.calculate_cost_cents() - old
+            if type(orders) is dict:
+                for order, count in orders.items():
+                    order._subtotal += delta * count
+            else:
+                orders._subtotal += delta
+
+    # Pack the Blizzard into ordinals for columnar storage.
+    def _encode(self):
+        """
+        Returns the Blizzard as (base ordinal, topping bitmask, size ordinal).
+
+        Returns:
+            tuple: The Blizzard's ordinals and bitmask. The size ordinal is always 0.
+        """
+        return BASE_PRICES.ordinals[self._base], self._toppings, 0
+
+    # Rebuild a Blizzard from its packed form.
+    @classmethod
+    def _decode(cls, base, toppings, size):
+        """
+        Builds a Blizzard from the output of `_encode`.
+
+        Args:
+            base (int): The base ordinal.
+            toppings (int): The topping bitmask.
+            size (int): Unused; a Blizzard has no size.
+
+        Returns:
+            Blizzard: The rebuilt Blizzard.
+        """
+        item = cls()
+        item._base = BASE_PRICES.members[base]
+        item._toppings = toppings
+        return item
+
     def calculate_cost(self):
         """
         Calculates and returns the cost of the Blizzard.
@@ -158,21 +273,74 @@ class Blizzard:
         Returns:
             float: The cost of the Blizzard.
         """
-        base_cost = 0.00
-        topping_cost = 0.00
-        match self._base:
-            case BlizzardFlavor.VANILLA | BlizzardFlavor.CHOCOLATE:
-                base_cost = 3.00
-            case BlizzardFlavor.BANANA | BlizzardFlavor.BUTTER_PECAN:
-                base_cost = 3.50
-            case BlizzardFlavor.SMORE | BlizzardFlavor.MINT_CHIP:
-                base_cost = 4.00
-        for topping in list(self._toppings):
-            match topping:
-                case BlizzardTopping.CHERRY | BlizzardTopping.WHIPPED_CREAM:
-                    continue
-                case BlizzardTopping.CARAMEL | BlizzardTopping.CHOCOLATE | BlizzardTopping.PECANS:
-                    topping_cost += 0.50
-                case BlizzardTopping.OREO | BlizzardTopping.KITKAT | BlizzardTopping.MMS | BlizzardTopping.COOKIE_DOUGH:
-                    topping_cost += 1.00
-        return base_cost + topping_cost
+        return to_dollars(self.calculate_cost_cents())
+
+    # Return the shared, immutable copy of this Blizzard's configuration.
+    def freeze(self):
+        """
+        Returns the interned `FrozenBlizzard` with the same configuration as this Blizzard.
+
+        Every Blizzard with the same base and toppings gets the same instance, priced once.
+
+        Returns:
+            FrozenBlizzard: The shared frozen Blizzard.
+        """
+        key = self._encode()
+        frozen = _FROZEN.get(key)
+        if frozen is None:
+            frozen = FrozenBlizzard._decode(*key)
+            frozen.calculate_cost_cents()
+            frozen = _FROZEN.setdefault(key, frozen)
+        return frozen
+
+# Interned frozen Blizzards, keyed by their `_encode` tuple.
+_FROZEN = {}
+
+# Create class "FrozenBlizzard"
+class FrozenBlizzard(Blizzard):
+    """
+    An immutable, interned Blizzard, made with `Blizzard.freeze`.
+
+    Identical configurations share one instance and one cached price, and an
+    order holding one keeps no back-reference to it. The mutators raise
+    TypeError; `thaw` (or `Order.thaw_item`) gives an editable `Blizzard`.
+    """
+    __slots__ = ()
+
+    _frozen = True
+
+    # A frozen Blizzard is already interned.
+    def freeze(self):
+        """
+        Returns this Blizzard, which is already frozen.
+
+        Returns:
+            FrozenBlizzard: This Blizzard.
+        """
+        return self
+
+    # Return an editable copy.
+    def thaw(self):
+        """
+        Returns a new, editable `Blizzard` with this Blizzard's configuration.
+
+        Returns:
+            Blizzard: The editable copy.
+        """
+        item = Blizzard._decode(*self._encode())
+        # Repriced first, so the copy never carries a cost from before a price change.
+        item._cost = self.calculate_cost_cents()
+        item._priced = self._priced
+        return item
+
+    def set_base(self, base):
+        """Raises TypeError; thaw the Blizzard first."""
+        raise TypeError("A frozen Blizzard cannot be changed. Use thaw() for an editable copy.")
+
+    def add_topping(self, topping):
+        """Raises TypeError; thaw the Blizzard first."""
+        raise TypeError("A frozen Blizzard cannot be changed. Use thaw() for an editable copy.")
+
+    def set_toppings(self, toppings):
+        """Raises TypeError; thaw the Blizzard first."""
+        raise TypeError("A frozen Blizzard cannot be changed. Use thaw() for an editable copy.")
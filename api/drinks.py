@@ -1,5 +1,7 @@
 from enum import Enum
 
+from .pricing import COST_CACHE, PriceTable, to_dollars
+
 class Size(Enum):
     """
     An enumeration of different size categories.
@@ -19,16 +21,85 @@ class Size(Enum):
     LARGE = "Large"
     MEGA = "Mega"
 
+class DrinkBase(Enum):
+    """
+    An enumeration of different drink bases.
+
+    Attributes:
+        NULL: Default; none set.
+        WATER: Water
+        SPRITE: Sprite
+        COCA_COLA: Coca-Cola
+        DR_PEPPER: Dr. Pepper
+        STARRY: Starry
+        ROOT_BEER: Root Beer
+    """
+    def __str__(self):
+        return str(self.value)
+    NULL = None
+    WATER = "Water"
+    SPRITE = "Sprite"
+    COCA_COLA = "Coca-Cola"
+    DR_PEPPER = "Dr. Pepper"
+    STARRY = "Starry"
+    ROOT_BEER = "Root Beer"
+
+class Flavor(Enum):
+    """
+    An enumeration of different drink flavors.
+
+    Attributes:
+        LEMON: Lemon ($0.15)
+        CHERRY: Cherry ($0.15)
+        STRAWBERRY: Strawberry ($0.15)
+        MINT: Mint ($0.15)
+        BLUEBERRY: Blueberry ($0.15)
+        LIME: Lime ($0.15)
+    """
+    def __str__(self):
+        return str(self.value)
+    LEMON = "Lemon"
+    CHERRY = "Cherry"
+    STRAWBERRY = "Strawberry"
+    MINT = "Mint"
+    BLUEBERRY = "Blueberry"
+    LIME = "Lime"
+
+# Prices, in cents, compiled into flat lookup tables.
+SIZE_PRICES = PriceTable("drink.size", Size, {
+    Size.SMALL: 150,
+    Size.MEDIUM: 175,
+    Size.LARGE: 205,
+    Size.MEGA: 215,
+})
+# The base does not change a drink's price.
+BASE_PRICES = PriceTable("drink.base", DrinkBase, {})
+# Every flavor shot costs the same.
+FLAVOR_PRICES = PriceTable("drink.flavor", Flavor, dict.fromkeys(Flavor, 15))
+
 # Create class "Drink"
 class Drink:
     """
     A class for storing a drink object.
 
     Attributes:
-        _base (str): The base of the drink (e.g., "Water", "Sprite").
-        _flavors (set): A set of flavors in the drink (e.g., {"Lemon", "Cherry"}).
+        _base (DrinkBase): The base of the drink (e.g., DrinkBase.WATER, DrinkBase.SPRITE).
+        _flavors (int): A bitmask of flavors, with one bit per `Flavor` enum (see `FLAVOR_PRICES`).
+        _size (Size): The size of the drink. Size names are stored as their `Size` enum.
     """
     
+    # No per-instance __dict__; these are the only attributes an instance has.
+    __slots__ = ("_base", "_flavors", "_size", "_cost", "_priced", "_orders")
+
+    # The base, topping/flavor and size tables `price_many` prices this class with.
+    _price_tables = ("drink.base", "drink.flavor", "drink.size")
+
+    # The slots holding the base, bitmask and size; `price_many` reads them directly.
+    _price_attrs = ("_base", "_flavors", "_size")
+
+    # Frozen subclasses are immutable and shared; see `freeze`.
+    _frozen = False
+
     # Initialize the valid bases and flavors.
     _valid_bases = {"water", "sprite", "coca-cola", "dr. pepper", "starry", "root beer"}
     _valid_flavors = {"lemon", "cherry", "strawberry", "mint", "blueberry", "lime"}
@@ -45,10 +116,18 @@ class Drink:
         Raises:
             ValueError: If the size is invalid.
         """
-        self._base = None
-        self._flavors = set()
-        self._size = size
-        self._cost = 0.00
+        self._base = DrinkBase.NULL
+        self._flavors = 0
+        member = SIZE_PRICES.lookup(size)
+        if member not in self._valid_sizes:
+            raise ValueError(f"Pick a proper size from {self._valid_sizes}.")
+        self._size = member
+        # Memoized cost in cents; None until priced or after any change.
+        self._cost = None
+        # The `COST_CACHE.generation` `_cost` was computed under; an older one means a price has changed since.
+        self._priced = -1
+        # The storage of the order holding this drink (see `Order`), or None. Held more than once, it maps each storage to how often it holds the drink.
+        self._orders = None
 
     # Return the _base property.
     def get_base(self):
@@ -56,9 +135,9 @@ class Drink:
         Returns the base of the drink.
 
         Returns:
-            str: The base of the drink.
+            str: The base of the drink, or None if it has not been set.
         """
-        return self._base
+        return self._base.value
     
     # Return the _flavors property.
     def get_flavors(self):
@@ -68,7 +147,7 @@ class Drink:
         Returns:
             list: A list of the drink's flavors.
         """
-        return list(self._flavors)
+        return FLAVOR_PRICES.decode(self._flavors)
     
     # Return the number of flavors.
     def get_num_flavors(self):
@@ -78,7 +157,20 @@ class Drink:
         Returns:
             int: The number of flavors.
         """
-        return len(self._flavors)
+        return self._flavors.bit_count()
+
+    # Check for a flavor with a single bit test.
+    def has_flavor(self, flavor):
+        """
+        Returns whether the drink has a flavor.
+
+        Args:
+            flavor (str): The flavor to look for (e.g. "Lemon"). `Flavor` enums can also be used.
+
+        Returns:
+            bool: True if the drink has the flavor.
+        """
+        return bool(self._flavors & (FLAVOR_PRICES.bit(flavor) or 0))
 
     def get_size(self):
         """
@@ -95,15 +187,16 @@ class Drink:
         Sets the base of the drink.
 
         Args:
-            base (str): The new base for the drink. Valid bases are "Water", "Sprite", "Coca-Cola", "Dr. Pepper", "Starry", and "Root Beer".
+            base (str): The new base for the drink. Valid bases are "Water", "Sprite", "Coca-Cola", "Dr. Pepper", "Starry", and "Root Beer", or the `DrinkBase` enums for them.
 
         Raises:
             ValueError: If the base is invalid.
         """
-        if base.casefold() in self._valid_bases:
-            self._base = base
-        else:
+        member = BASE_PRICES.lookup(base)
+        if member is None or member is DrinkBase.NULL:
             raise ValueError(f"Pick a proper base from {self._valid_bases}.")
+        self._base = member
+        self._changed()
     
     # Add a flavor to the _flavors property.
     def add_flavor(self, flavor):
@@ -116,10 +209,11 @@ class Drink:
         Raises:
             ValueError: If the flavor is invalid.
         """
-        if flavor.casefold() in self._valid_flavors:
-            self._flavors.add(flavor)
-        else:
+        bit = FLAVOR_PRICES.bit(flavor)
+        if bit is None:
             raise ValueError(f"Pick a proper flavor from {self._valid_flavors}.")
+        self._flavors |= bit
+        self._changed()
 
     # Set the _flavors property to a given list.
     def set_flavors(self, flavors):
@@ -132,10 +226,14 @@ class Drink:
         Raises:
             ValueError: If any of the flavors are invalid.
         """
+        mask = 0
         for flavor in flavors:
-            if flavor.casefold() not in self._valid_flavors:
+            bit = FLAVOR_PRICES.bit(flavor)
+            if bit is None:
                 raise ValueError(f"Pick a proper flavor from {self._valid_flavors}.")
-        self._flavors = set(flavors)
+            mask |= bit
+        self._flavors = mask
+        self._changed()
     
     def set_size(self, size):
         """
@@ -147,11 +245,72 @@ class Drink:
         Raises:
             ValueError: If the size is invalid.
         """
-        if size.casefold() in self._valid_sizes:
-            self._size = size
-        else:
+        member = SIZE_PRICES.lookup(size)
+        if member not in self._valid_sizes:
             raise ValueError(f"Pick a proper size from {self._valid_sizes}.")
+        self._size = member
+        self._changed()
     
+    def calculate_cost_cents(self):
+        """
+        Calculates and returns the cost of the drink in cents.
+
+        Returns:
+            int: The cost of the drink in cents.
+        """
+        if self._cost is None or self._priced != COST_CACHE.generation:
+            COST_CACHE.misses += 1
+            self._cost = SIZE_PRICES.price(self._size) + FLAVOR_PRICES.price_mask(self._flavors)
+            self._priced = COST_CACHE.generation
+        else:
+            COST_CACHE.hits += 1
+        return self._cost
+
+    # Drop the cached cost and re-total any order holding the drink.
+    def _changed(self):
+        """
+        Invalidates the cached cost after a change and moves every order holding the drink to its new price.
+        """
+        old = self._cost
+        self._cost = None
+        orders = self._orders
+        if orders is not None:
+            delta = self.calculate_cost_cents() - old
+            if type(orders) is dict:
+                for order, count in orders.items():
+                    order._subtotal += delta * count
+            else:
+                orders._subtotal += delta
+
+    # Pack the drink into ordinals for columnar storage.
+    def _encode(self):
+        """
+        Returns the drink as (base ordinal, flavor bitmask, size ordinal).
+
+        Returns:
+            tuple: The drink's ordinals and bitmask.
+        """
+        return BASE_PRICES.ordinals[self._base], self._flavors, SIZE_PRICES.ordinals[self._size]
+
+    # Rebuild a drink from its packed form.
+    @classmethod
+    def _decode(cls, base, flavors, size):
+        """
+        Builds a drink from the output of `_encode`.
+
+        Args:
+            base (int): The base ordinal.
+            flavors (int): The flavor bitmask.
+            size (int): The size ordinal.
+
+        Returns:
+            Drink: The rebuilt drink.
+        """
+        item = cls(SIZE_PRICES.members[size])
+        item._base = BASE_PRICES.members[base]
+        item._flavors = flavors
+        return item
+
     def calculate_cost(self):
         """
         Calculates and returns the cost of the drink.
@@ -159,14 +318,78 @@ class Drink:
         Returns:
             float: The cost of the drink.
         """
-        base_cost = 0.00
-        match self._size:
-            case Size.SMALL:
-                base_cost = 1.50
-            case Size.MEDIUM:
-                base_cost = 1.75
-            case Size.LARGE:
-                base_cost = 2.05
-            case Size.MEGA:
-                base_cost = 2.15
-        return base_cost + len(self._flavors) * 0.15
+        return to_dollars(self.calculate_cost_cents())
+
+    # Return the shared, immutable copy of this drink's configuration.
+    def freeze(self):
+        """
+        Returns the interned `FrozenDrink` with the same configuration as this drink.
+
+        Every drink with the same base, flavors and size gets the same instance, priced once.
+
+        Returns:
+            FrozenDrink: The shared frozen drink.
+        """
+        key = self._encode()
+        frozen = _FROZEN.get(key)
+        if frozen is None:
+            frozen = FrozenDrink._decode(*key)
+            frozen.calculate_cost_cents()
+            frozen = _FROZEN.setdefault(key, frozen)
+        return frozen
+
+# Interned frozen drinks, keyed by their `_encode` tuple.
+_FROZEN = {}
+
+# Create class "FrozenDrink"
+class FrozenDrink(Drink):
+    """
+    An immutable, interned Drink, made with `Drink.freeze`.
+
+    Identical configurations share one instance and one cached price, and an
+    order holding one keeps no back-reference to it. The mutators raise
+    TypeError; `thaw` (or `Order.thaw_item`) gives an editable `Drink`.
+    """
+    __slots__ = ()
+
+    _frozen = True
+
+    # A frozen drink is already interned.
+    def freeze(self):
+        """
+        Returns this drink, which is already frozen.
+
+        Returns:
+            FrozenDrink: This drink.
+        """
+        return self
+
+    # Return an editable copy.
+    def thaw(self):
+        """
+        Returns a new, editable `Drink` with this drink's configuration.
+
+        Returns:
+            Drink: The editable copy.
+        """
+        item = Drink._decode(*self._encode())
+        # Repriced first, so the copy never carries a cost from before a price change.
+        item._cost = self.calculate_cost_cents()
+        item._priced = self._priced
+        return item
+
+    def set_base(self, base):
+        """Raises TypeError; thaw the drink first."""
+        raise TypeError("A frozen drink cannot be changed. Use thaw() for an editable copy.")
+
+    def add_flavor(self, flavor):
+        """Raises TypeError; thaw the drink first."""
+        raise TypeError("A frozen drink cannot be changed. Use thaw() for an editable copy.")
+
+    def set_flavors(self, flavors):
+        """Raises TypeError; thaw the drink first."""
+        raise TypeError("A frozen drink cannot be changed. Use thaw() for an editable copy.")
+
+    def set_size(self, size):
+        """Raises TypeError; thaw the drink first."""
+        raise TypeError("A frozen drink cannot be changed. Use thaw() for an editable copy.")
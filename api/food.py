@@ -1,5 +1,7 @@
 from enum import Enum
 
+from .pricing import COST_CACHE, PriceTable, to_dollars
+
 class Foods(Enum):
     """
     An enumeration of different food categories.
@@ -52,6 +54,24 @@ class Topping(Enum):
     CHOCOLATE = "Chocolate Sauce"
     CHILI = "Chili"
 
+# Prices, in cents, compiled into flat lookup tables.
+BASE_PRICES = PriceTable("food.base", Foods, {
+    Foods.HOT_DOG: 230,
+    Foods.CORN_DOG: 200,
+    Foods.ICE_CREAM: 300,
+    Foods.ONION_RINGS: 175,
+    Foods.FRIES: 150,
+    Foods.TOTS: 170,
+    Foods.NACHOS: 190,
+})
+TOPPING_PRICES = PriceTable("food.topping", Topping, {
+    Topping.CHEESE: 30,
+    Topping.BACON: 30,
+    Topping.CARAMEL: 50,
+    Topping.CHOCOLATE: 50,
+    Topping.CHILI: 60,
+})
+
 # Create class "Food"
 class Food:
     """
@@ -59,9 +79,21 @@ class Food:
 
     Attributes:
         _base (str): The base of the food (e.g., "Hot Dog", "Onion Rings"). Foods enums can also be used.
-        _toppings (set): A set of toppings on the food (e.g., {"Cherry", "Chili"}).
+        _toppings (int): A bitmask of toppings, with one bit per topping enum (see `TOPPING_PRICES`).
     """
 
+    # No per-instance __dict__; these are the only attributes an instance has.
+    __slots__ = ("_base", "_toppings", "_cost", "_priced", "_orders")
+
+    # The base, topping/flavor and size tables `price_many` prices this class with.
+    _price_tables = ("food.base", "food.topping", None)
+
+    # The slots holding the base, bitmask and size; `price_many` reads them directly.
+    _price_attrs = ("_base", "_toppings", None)
+
+    # Frozen subclasses are immutable and shared; see `freeze`.
+    _frozen = False
+
     _valid_bases = {"hot dog", "corn dog", "ice cream", "onion rings", "french fries", "tater tots", "nacho chips"}
     _valid_toppings = {"cherry", "whipped cream", "caramel sauce", "chocolate sauce", "nacho cheese", "chili", "bacon bits", "ketchup", "mustard"}
 
@@ -70,8 +102,13 @@ class Food:
         Initializes an empty `Food` object.
         """
         self._base = Foods.NULL
-        self._toppings = set()
-        self._cost = 0.00
+        self._toppings = 0
+        # Memoized cost in cents; None until priced or after any change.
+        self._cost = None
+        # The `COST_CACHE.generation` `_cost` was computed under; an older one means a price has changed since.
+        self._priced = -1
+        # The storage of the order holding this food (see `Order`), or None. Held more than once, it maps each storage to how often it holds the food.
+        self._orders = None
     
     # Return the _base property.
     def get_base(self):
@@ -91,7 +128,7 @@ class Food:
         Returns:
             list: A list of the food's toppings.
         """
-        return list(self._toppings)
+        return TOPPING_PRICES.decode(self._toppings)
     
     # Return the number of toppings.
     def get_num_toppings(self):
@@ -101,7 +138,20 @@ class Food:
         Returns:
             int: The number of toppings.
         """
-        return len(self._toppings)
+        return self._toppings.bit_count()
+
+    # Check for a topping with a single bit test.
+    def has_topping(self, topping):
+        """
+        Returns whether the food has a topping.
+
+        Args:
+            topping (Topping): The topping to look for.
+
+        Returns:
+            bool: True if the food has the topping.
+        """
+        return bool(self._toppings & (TOPPING_PRICES.bit(topping) or 0))
 
     # Set the food's _base property.
     def set_base(self, base):
@@ -109,15 +159,16 @@ class Food:
         Sets the base of the food.
 
         Args:
-            base (str): The new base for the food. Valid bases are any Foods enum value aside from Foods.NULL.
+            base (str): The new base for the food. Valid bases are any Foods enum value aside from Foods.NULL, or its name (e.g. "Hot Dog").
 
         Raises:
             ValueError: If the base is invalid.
         """
-        if base.value.casefold() in self._valid_bases:
-            self._base = base
-        else:
+        member = BASE_PRICES.lookup(base)
+        if member is None or member is Foods.NULL:
             raise ValueError(f"Pick a proper base from {self._valid_bases}.")
+        self._base = member
+        self._changed()
     
     # Add a topping to the _toppings property.
     def add_topping(self, topping):
@@ -130,10 +181,11 @@ class Food:
         Raises:
             ValueError: If the topping is invalid.
         """
-        if topping.value.casefold() in self._valid_toppings:
-            self._toppings.add(topping.value)
-        else:
+        bit = TOPPING_PRICES.bit(topping)
+        if bit is None:
             raise ValueError(f"Pick a proper topping from {self._valid_toppings}.")
+        self._toppings |= bit
+        self._changed()
 
     # Set the _toppings property to a given list.
     def set_toppings(self, toppings):
@@ -146,13 +198,75 @@ class Food:
         Raises:
             ValueError: If any of the toppings are invalid.
         """
+        mask = 0
         for topping in toppings:
-            if topping.value.casefold() not in self._valid_toppings:
+            bit = TOPPING_PRICES.bit(topping)
+            if bit is None:
                 raise ValueError(f"Pick a proper topping from {self._valid_toppings}.")
-        topping_set = set(toppings)
-        for topping in topping_set:
-            self._toppings.add(topping.value)
+            mask |= bit
+        self._toppings |= mask
+        self._changed()
     
+    def calculate_cost_cents(self):
+        """
+        Calculates and returns the cost of the food in cents.
+
+        Returns:
+            int: The cost of the food in cents.
+        """
+        if self._cost is None or self._priced != COST_CACHE.generation:
+            COST_CACHE.misses += 1
+            self._cost = BASE_PRICES.price(self._base) + TOPPING_PRICES.price_mask(self._toppings)
+            self._priced = COST_CACHE.generation
+        else:
+            COST_CACHE.hits += 1
+        return self._cost
+
+    # Drop the cached cost and re-total any order holding the food.
+    def _changed(self):
+        """
+        Invalidates the cached cost after a change and moves every order holding the food to its new price.
+        """
+        old = self._cost
+        self._cost = None
+        orders = self._orders
+        if orders is not None:
+            delta = self.calculate_cost_cents() - old
+            if type(orders) is dict:
+                for order, count in orders.items():
+                    order._subtotal += delta * count
+            else:
+                orders._subtotal += delta
+
+    # Pack the food into ordinals for columnar storage.
+    def _encode(self):
+        """
+        Returns the food as (base ordinal, topping bitmask, size ordinal).
+
+        Returns:
+            tuple: The food's ordinals and bitmask. The size ordinal is always 0.
+        """
+        return BASE_PRICES.ordinals[self._base], self._toppings, 0
+
+    # Rebuild a food from its packed form.
+    @classmethod
+    def _decode(cls, base, toppings, size):
+        """
+        Builds a food from the output of `_encode`.
+
+        Args:
+            base (int): The base ordinal.
+            toppings (int): The topping bitmask.
+            size (int): Unused; a food has no size.
+
+        Returns:
+            Food: The rebuilt food.
+        """
+        item = cls()
+        item._base = BASE_PRICES.members[base]
+        item._toppings = toppings
+        return item
+
     def calculate_cost(self):
         """
         Calculates and returns the cost of the food.
@@ -160,24 +274,74 @@ class Food:
         Returns:
             float: The cost of the food.
         """
-        base_cost = 0.00
-        topping_cost = 0.00
-        match self._base:
-            case Foods.HOT_DOG: base_cost = 2.30
-            case Foods.CORN_DOG: base_cost = 2.00
-            case Foods.ICE_CREAM: base_cost = 3.00
-            case Foods.ONION_RINGS: base_cost = 1.75
-            case Foods.FRIES: base_cost = 1.50
-            case Foods.TOTS: base_cost = 1.70
-            case Foods.NACHOS: base_cost = 1.90
-        for topping in list(self._toppings):
-            match topping:
-                case Topping.CHERRY | Topping.WHIPPED_CREAM | Topping.KETCHUP | Topping.MUSTARD:
-                    continue
-                case Topping.CHEESE | Topping.BACON:
-                    topping_cost += 0.30
-                case Topping.CARAMEL | Topping.CHOCOLATE:
-                    topping_cost += 0.50
-                case Topping.CHILI:
-                    topping_cost += 0.60
-        return base_cost + topping_cost
+        return to_dollars(self.calculate_cost_cents())
+
+    # Return the shared, immutable copy of this food's configuration.
+    def freeze(self):
+        """
+        Returns the interned `FrozenFood` with the same configuration as this food.
+
+        Every food with the same base and toppings gets the same instance, priced once.
+
+        Returns:
+            FrozenFood: The shared frozen food.
+        """
+        key = self._encode()
+        frozen = _FROZEN.get(key)
+        if frozen is None:
+            frozen = FrozenFood._decode(*key)
+            frozen.calculate_cost_cents()
+            frozen = _FROZEN.setdefault(key, frozen)
+        return frozen
+
+# Interned frozen foods, keyed by their `_encode` tuple.
+_FROZEN = {}
+
+# Create class "FrozenFood"
+class FrozenFood(Food):
+    """
+    An immutable, interned Food, made with `Food.freeze`.
+
+    Identical configurations share one instance and one cached price, and an
+    order holding one keeps no back-reference to it. The mutators raise
+    TypeError; `thaw` (or `Order.thaw_item`) gives an editable `Food`.
+    """
+    __slots__ = ()
+
+    _frozen = True
+
+    # A frozen food is already interned.
+    def freeze(self):
+        """
+        Returns this food, which is already frozen.
+
+        Returns:
+            FrozenFood: This food.
+        """
+        return self
+
+    # Return an editable copy.
+    def thaw(self):
+        """
+        Returns a new, editable `Food` with this food's configuration.
+
+        Returns:
+            Food: The editable copy.
+        """
+        item = Food._decode(*self._encode())
+        # Repriced first, so the copy never carries a cost from before a price change.
+        item._cost = self.calculate_cost_cents()
+        item._priced = self._priced
+        return item
+
+    def set_base(self, base):
+        """Raises TypeError; thaw the food first."""
+        raise TypeError("A frozen food cannot be changed. Use thaw() for an editable copy.")
+
+    def add_topping(self, topping):
+        """Raises TypeError; thaw the food first."""
+        raise TypeError("A frozen food cannot be changed. Use thaw() for an editable copy.")
+
+    def set_toppings(self, toppings):
+        """Raises TypeError; thaw the food first."""
+        raise TypeError("A frozen food cannot be changed. Use thaw() for an editable copy.")
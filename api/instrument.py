@@ -0,0 +1,154 @@
+import functools
+import inspect
+from bisect import bisect_left
+from time import perf_counter_ns
+
+from .blizzard import Blizzard
+from .drinks import Drink
+from .food import Food
+from .orders import Order
+
+# Histogram bucket upper bounds, in nanoseconds.
+BUCKETS_NS = (500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 1_000_000, 10_000_000, 100_000_000)
+
+# The classes instrumented by default.
+CLASSES = (Food, Drink, Blizzard, Order)
+
+# Create class "MethodStats"
+class MethodStats:
+    """
+    Call counts and a latency histogram for one method.
+
+    Attributes:
+        count (int): The number of calls.
+        total_ns (int): The total time spent in the method, in nanoseconds.
+        buckets (list): The number of calls that fell in each `BUCKETS_NS` bucket, plus one final bucket for anything slower.
+    """
+    __slots__ = ("count", "total_ns", "buckets")
+
+    def __init__(self):
+        """Initializes every counter at zero."""
+        self.clear()
+
+    # Set every counter back to zero.
+    def clear(self):
+        """Resets every counter to zero."""
+        self.count = 0
+        self.total_ns = 0
+        self.buckets = [0] * (len(BUCKETS_NS) + 1)
+
+    # Record one call.
+    def record(self, elapsed_ns):
+        """
+        Records one call.
+
+        Args:
+            elapsed_ns (int): How long the call took, in nanoseconds.
+        """
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.buckets[bisect_left(BUCKETS_NS, elapsed_ns)] += 1
+
+# Maps "Class.method" to its MethodStats.
+STATS = {}
+# Maps (class, name) to the original function while instrumentation is enabled.
+_originals = {}
+
+# Wrap one function so every call is timed.
+def _timed(function, stats):
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.record(perf_counter_ns() - start)
+    return timed
+
+# Swap timed methods into the classes.
+def enable(classes=CLASSES):
+    """
+    Replaces each class's public methods (and `__init__`) with timed versions.
+
+    Nothing is timed until this is called, and `disable` puts the original
+    methods back, so instrumentation costs nothing while it is off. Generator
+    methods such as `Order.iter_receipt` are left alone, since only creating
+    the generator would be timed.
+
+    Args:
+        classes (tuple): The classes to instrument.
+    """
+    for cls in classes:
+        for name, function in list(vars(cls).items()):
+            if (cls, name) in _originals or not inspect.isfunction(function) or inspect.isgeneratorfunction(function):
+                continue
+            if name.startswith("_") and name != "__init__":
+                continue
+            stats = STATS.setdefault(f"{cls.__name__}.{name}", MethodStats())
+            _originals[(cls, name)] = function
+            setattr(cls, name, _timed(function, stats))
+
+# Put the original methods back.
+def disable():
+    """Restores every method replaced by `enable`. Collected stats are kept."""
+    for (cls, name), function in _originals.items():
+        setattr(cls, name, function)
+    _originals.clear()
+
+# Report whether timed methods are in place.
+def is_enabled():
+    """
+    Returns whether instrumentation is on.
+
+    Returns:
+        bool: True between `enable` and `disable`.
+    """
+    return bool(_originals)
+
+# Forget every collected stat.
+def reset():
+    """Resets every collected stat to zero."""
+    for stats in STATS.values():
+        stats.clear()
+
+# Export the stats as plain data.
+def snapshot():
+    """
+    Returns the collected stats as plain data.
+
+    Returns:
+        dict: Maps "Class.method" to {"count", "total_seconds", "mean_seconds", "buckets"}, where "buckets" maps each upper bound in seconds ("+Inf" last) to the cumulative number of calls.
+    """
+    result = {}
+    for name, stats in sorted(STATS.items()):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*BUCKETS_NS, None), stats.buckets):
+            cumulative += count
+            buckets["+Inf" if bound is None else bound / 1e9] = cumulative
+        result[name] = {
+            "count": stats.count,
+            "total_seconds": stats.total_ns / 1e9,
+            "mean_seconds": stats.total_ns / stats.count / 1e9 if stats.count else 0.0,
+            "buckets": buckets,
+        }
+    return result
+
+# Export the stats in Prometheus text format.
+def to_prometheus(metric="api_method_duration_seconds"):
+    """
+    Returns the collected stats as a Prometheus text-format histogram.
+
+    Args:
+        metric (str): The metric name.
+
+    Returns:
+        str: One histogram series per method, labelled with `method="Class.method"`.
+    """
+    lines = [f"# HELP {metric} Time spent in instrumented api methods.", f"# TYPE {metric} histogram"]
+    for name, data in snapshot().items():
+        for bound, count in data["buckets"].items():
+            lines.append(f'{metric}_bucket{{method="{name}",le="{bound}"}} {count}')
+        lines.append(f'{metric}_sum{{method="{name}"}} {data["total_seconds"]}')
+        lines.append(f'{metric}_count{{method="{name}"}} {data["count"]}')
+    return "\n".join(lines) + "\n"
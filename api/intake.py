@@ -0,0 +1,181 @@
+import asyncio
+
+from .loader import parse_order
+from .orders import Order
+
+# Create class "IntakeMetrics"
+class IntakeMetrics:
+    """
+    Counters for an `IntakeService`.
+
+    Attributes:
+        submitted (int): Orders accepted onto the queue.
+        completed (int): Orders that got a receipt.
+        failed (int): Orders rejected during validation.
+        batches (int): Batches processed.
+        batch_sizes (dict): Maps each batch size to the number of batches of that size.
+        max_queue_depth (int): The deepest the queue has been.
+    """
+
+    def __init__(self):
+        """Initializes every counter at zero."""
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self.batch_sizes = {}
+        self.max_queue_depth = 0
+
+    # Return the average batch size.
+    def mean_batch_size(self):
+        """
+        Returns the average number of orders per batch.
+
+        Returns:
+            float: The mean batch size, or 0.0 before any batch has run.
+        """
+        return (self.completed + self.failed) / self.batches if self.batches else 0.0
+
+# Create class "IntakeService"
+class IntakeService:
+    """
+    An asyncio order intake that micro-batches concurrent submissions.
+
+    Registers call `submit`, which waits for room on a bounded queue (so a
+    backed-up service slows its callers down) and then for the order's receipt.
+    A single worker task drains the queue in batches of up to `max_batch`
+    orders, waiting at most `max_wait` seconds to fill a batch, then validates,
+    prices and writes receipts for the whole batch in one pass.
+
+    Attributes:
+        max_batch (int): The most orders processed in one batch.
+        max_wait (float): The longest, in seconds, a batch waits to fill up.
+        metrics (IntakeMetrics): Counters for the service.
+    """
+
+    def __init__(self, max_queue=1024, max_batch=64, max_wait=0.005):
+        """
+        Initializes an `IntakeService`. Call `start` (or use `async with`) before submitting.
+
+        Args:
+            max_queue (int): The most orders waiting on the queue before `submit` blocks.
+            max_batch (int): The most orders processed in one batch.
+            max_wait (float): The longest, in seconds, a batch waits to fill up.
+
+        Raises:
+            ValueError: If `max_queue` or `max_batch` is not positive.
+        """
+        if max_queue < 1 or max_batch < 1:
+            raise ValueError("max_queue and max_batch must be at least 1.")
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.metrics = IntakeMetrics()
+        self._queue = asyncio.Queue(max_queue)
+        self._worker = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    # Return the number of orders waiting.
+    def get_queue_depth(self):
+        """
+        Returns the number of orders waiting on the queue.
+
+        Returns:
+            int: The queue depth.
+        """
+        return self._queue.qsize()
+
+    # Start the batching worker.
+    async def start(self):
+        """Starts the worker task that processes batches."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    # Finish everything queued, then stop the worker.
+    async def stop(self):
+        """Waits for every queued order to be processed, then stops the worker task."""
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    # Queue an order and wait for its receipt.
+    async def submit(self, order):
+        """
+        Submits an order and waits for its receipt.
+
+        Args:
+            order (Order or dict): An `Order`, or an order record as read by `loader.parse_order`.
+
+        Returns:
+            str: The order's receipt.
+
+        Raises:
+            ValueError: If the order is invalid. Any other error building or pricing the order is raised here too, and only fails this order.
+            RuntimeError: If the service has not been started.
+        """
+        if self._worker is None:
+            raise RuntimeError("Start the intake service before submitting orders.")
+        future = asyncio.get_running_loop().create_future()
+        # Blocks here while the queue is full.
+        await self._queue.put((order, future))
+        self.metrics.submitted += 1
+        depth = self._queue.qsize()
+        if depth > self.metrics.max_queue_depth:
+            self.metrics.max_queue_depth = depth
+        return await future
+
+    # Pull batches off the queue forever.
+    async def _run(self):
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(queue.get_nowait())
+            try:
+                self._process(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    # Validate and price one batch, then resolve its futures.
+    def _process(self, batch):
+        metrics = self.metrics
+        metrics.batches += 1
+        metrics.batch_sizes[len(batch)] = metrics.batch_sizes.get(len(batch), 0) + 1
+        for order, future in batch:
+            # Building an Order validates every item and prices it once; the receipt reuses those prices.
+            try:
+                if not isinstance(order, Order):
+                    order = parse_order(order)
+                receipt = order.get_receipt()
+            # Any error belongs to this order alone; the worker must keep serving the rest.
+            except Exception as error:
+                metrics.failed += 1
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            metrics.completed += 1
+            # The caller may have given up waiting.
+            if not future.done():
+                future.set_result(receipt)
@@ -0,0 +1,303 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+from .archive import ITEM
+from .batch import KIND_OF, KINDS
+from .orders import Order
+
+# Each record is a frame header (body length, CRC32 of the body) followed by
+# the body: record type, order key, then for PUT records one archive item
+# record per line item.
+FRAME = struct.Struct("<II")
+BODY = struct.Struct("<BQ")
+PUT = 1
+DELETE = 2
+
+# Create class "JournalStats"
+class JournalStats:
+    """
+    Counters for one `Journal`.
+
+    Attributes:
+        records (int): Records committed.
+        commits (int): Group commits (one write and one fsync each).
+        bytes (int): Bytes committed.
+        sync_seconds (float): Time spent writing and syncing.
+    """
+
+    def __init__(self):
+        """Initializes every counter at zero."""
+        self.records = 0
+        self.commits = 0
+        self.bytes = 0
+        self.sync_seconds = 0.0
+
+    # Return the average group size.
+    def mean_batch_size(self):
+        """
+        Returns the average number of records per commit.
+
+        Returns:
+            float: The mean group size, or 0.0 before any commit.
+        """
+        return self.records / self.commits if self.commits else 0.0
+
+# Encode one record.
+def _frame(kind, key, order=None):
+    body = [BODY.pack(kind, key)]
+    if order is not None:
+        pack = ITEM.pack
+        for item in order.get_items():
+            code = KIND_OF.get(type(item))
+            if code is None:
+                raise ValueError("A journal can only hold drinks, food, or Blizzards.")
+            body.append(pack(code, *item._encode(), item.calculate_cost_cents()))
+    body = b"".join(body)
+    return FRAME.pack(len(body), zlib.crc32(body)) + body
+
+# Rebuild the journal's state from its file.
+def replay(path):
+    """
+    Reads a journal from the start and rebuilds the orders it records.
+
+    Reading stops at the first frame that is cut short or fails its checksum,
+    which is where a crash interrupted the last write.
+
+    Args:
+        path (str): The journal file. A missing file is an empty journal.
+
+    Returns:
+        tuple: A dict mapping each live order key to its rebuilt `Order`, the length in bytes of the valid
+        part of the file, and the highest key any valid record used (0 if none), removed orders included.
+    """
+    orders = {}
+    try:
+        with open(path, "rb") as fp:
+            data = fp.read()
+    except FileNotFoundError:
+        return orders, 0, 0
+    offset = 0
+    last_key = 0
+    while offset + FRAME.size <= len(data):
+        length, checksum = FRAME.unpack_from(data, offset)
+        start = offset + FRAME.size
+        body = data[start:start + length]
+        if length < BODY.size or len(body) < length or zlib.crc32(body) != checksum:
+            break
+        kind, key = BODY.unpack_from(body)
+        if kind not in (PUT, DELETE):
+            break
+        if key > last_key:
+            last_key = key
+        if kind == PUT:
+            order = Order()
+            for code, base, mask, size, _ in ITEM.iter_unpack(body[BODY.size:]):
+                order.add_item(KINDS[code]._decode(base, mask, size))
+            orders[key] = order
+        else:
+            orders.pop(key, None)
+        offset = start + length
+    return orders, offset, last_key
+
+# Create class "Journal"
+class Journal:
+    """
+    An append-only, checksummed journal of completed orders with group commit.
+
+    Records are queued in memory and a writer thread commits them in groups:
+    one write and one fsync once `max_batch` records are waiting or the oldest
+    has waited `max_delay` seconds. Callers of `append` wait for the commit that
+    holds their record, so many registers share one fsync instead of paying for
+    one each.
+
+    Opening a journal replays it; the rebuilt orders are in `recovered`, and a
+    torn record left by a crash is cut off.
+
+    Attributes:
+        path (str): The journal file.
+        max_batch (int): The most records committed together.
+        max_delay (float): The longest, in seconds, a record waits for its group to fill.
+        recovered (dict): The orders rebuilt from the journal when it was opened, by key.
+        stats (JournalStats): Counters for this journal.
+    """
+
+    def __init__(self, path, max_batch=64, max_delay=0.002, sync=True):
+        """
+        Opens (or creates) a journal and replays it.
+
+        Args:
+            path (str): The journal file.
+            max_batch (int): The most records committed together.
+            max_delay (float): The longest, in seconds, a record waits for its group to fill.
+            sync (bool): Whether commits call fsync. Turn it off only for tests and benchmarks.
+
+        Raises:
+            ValueError: If `max_batch` is not positive or `max_delay` is negative.
+        """
+        if max_batch < 1 or max_delay < 0:
+            raise ValueError("max_batch must be at least 1 and max_delay at least 0.")
+        self.path = path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.sync = sync
+        self.stats = JournalStats()
+        self.recovered, valid, last_key = replay(path)
+        # Never reuse a key, even one whose order was removed before a restart.
+        self._next_key = last_key + 1
+        self._fp = open(path, "ab")
+        if self._fp.tell() != valid:
+            self._fp.truncate(valid)
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._committed = threading.Condition(self._lock)
+        self._pending = []
+        self._first_pending = 0.0
+        self._queued = 0
+        self._durable = 0
+        self._error = None
+        # Set by flush to commit without waiting for the window to close.
+        self._force = False
+        self._closing = False
+        self._writer = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Pick the next key, or move past a key given explicitly, so auto keys never collide with it.
+    def _claim(self, key):
+        with self._lock:
+            if key is None:
+                key = self._next_key
+            if key >= self._next_key:
+                self._next_key = key + 1
+        return key
+
+    # Queue one record and optionally wait for it to be committed.
+    def _append(self, frame, wait):
+        with self._lock:
+            if self._closing:
+                raise ValueError("The journal is closed.")
+            if self._error is not None:
+                raise self._error
+            if not self._pending:
+                self._first_pending = time.monotonic()
+            self._pending.append(frame)
+            self._queued += 1
+            sequence = self._queued
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._ready.notify()
+            if wait:
+                while self._durable < sequence and self._error is None:
+                    self._committed.wait()
+                if self._error is not None:
+                    raise self._error
+
+    # Record a completed order.
+    def append(self, order, key=None, wait=True):
+        """
+        Records an order under a key, replacing any earlier record with that key.
+
+        Args:
+            order (Order): The order to record.
+            key (int): The order's key. Defaults to the next unused key; automatic keys always stay above any key given here.
+            wait (bool): Whether to return only once the record is committed.
+
+        Returns:
+            int: The order's key.
+
+        Raises:
+            ValueError: If the order holds something other than a `Drink`, `Food`, or `Blizzard`, or the journal is closed.
+            OSError: If committing failed.
+        """
+        key = self._claim(key)
+        self._append(_frame(PUT, key, order), wait)
+        return key
+
+    # Record that an order is gone.
+    def remove(self, key, wait=True):
+        """
+        Records that an order was removed (e.g. voided), so replay drops it.
+
+        Args:
+            key (int): The order's key.
+            wait (bool): Whether to return only once the record is committed.
+        """
+        self._append(_frame(DELETE, self._claim(key)), wait)
+
+    # Wait for every queued record.
+    def flush(self):
+        """
+        Commits every queued record now and waits for it.
+
+        Raises:
+            OSError: If committing failed.
+        """
+        with self._lock:
+            target = self._queued
+            while self._durable < target and self._error is None:
+                self._force = True
+                self._ready.notify()
+                self._committed.wait()
+            if self._error is not None:
+                raise self._error
+
+    # Commit what is queued and close the file.
+    def close(self):
+        """Commits every queued record, stops the writer and closes the file."""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            self._ready.notify()
+        self._writer.join()
+        self._fp.close()
+
+    # Commit groups of records until closed; runs on the writer thread.
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closing:
+                    self._ready.wait()
+                # Give the group until the window closes to fill up.
+                while self._pending and len(self._pending) < self.max_batch and not (self._closing or self._force):
+                    remaining = self._first_pending + self.max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                if not self._pending:
+                    return
+                group = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                if self._pending:
+                    # The rest starts the next group, whose window opens now.
+                    self._first_pending = time.monotonic()
+                else:
+                    self._force = False
+                sequence = self._queued - len(self._pending)
+            start = time.perf_counter()
+            data = b"".join(group)
+            try:
+                self._fp.write(data)
+                self._fp.flush()
+                if self.sync:
+                    os.fsync(self._fp.fileno())
+            except OSError as error:
+                with self._lock:
+                    self._error = error
+                    self._committed.notify_all()
+                return
+            stats = self.stats
+            stats.sync_seconds += time.perf_counter() - start
+            stats.records += len(group)
+            stats.commits += 1
+            stats.bytes += len(data)
+            with self._lock:
+                self._durable = sequence
+                self._committed.notify_all()
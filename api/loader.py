@@ -0,0 +1,320 @@
+import json
+import time
+from enum import Enum
+from itertools import islice
+
+from .batch import OrderBatch
+from .blizzard import Blizzard, FrozenBlizzard
+from .drinks import Drink, FrozenDrink
+from .food import Food, FrozenFood
+from .orders import Order
+from .pool import iter_tasks
+from .pricing import TABLES
+
+# The JSON "kind" of each item class.
+KIND_NAMES = {Food: "food", Drink: "drink", Blizzard: "blizzard"}
+_CLASSES = {name: cls for cls, name in KIND_NAMES.items()}
+# Frozen items are written like the items they were frozen from, and read back as those.
+KIND_NAMES.update({FrozenFood: "food", FrozenDrink: "drink", FrozenBlizzard: "blizzard"})
+# Drink._valid_sizes holds enums; records name sizes as strings.
+_VALID_SIZES = {size.value.casefold() for size in Drink._valid_sizes}
+
+# Create class "LineError"
+class LineError:
+    """
+    A line of the input that could not be turned into an `Order`.
+
+    Attributes:
+        line (int): The 1-based line number in the input.
+        message (str): Why the line was rejected.
+    """
+    __slots__ = ("line", "message")
+
+    def __init__(self, line, message):
+        """
+        Initializes a `LineError`.
+
+        Args:
+            line (int): The 1-based line number in the input.
+            message (str): Why the line was rejected.
+        """
+        self.line = line
+        self.message = message
+
+    def __repr__(self):
+        return f"LineError(line={self.line}, message={self.message!r})"
+
+# Create class "LoaderStats"
+class LoaderStats:
+    """
+    Running counters for one `OrderLoader.load` call.
+
+    Attributes:
+        lines (int): Lines read so far, blank lines included.
+        orders (int): Orders yielded so far.
+        errors (int): `LineError`s yielded so far.
+        elapsed (float): Seconds since loading started.
+    """
+
+    def __init__(self):
+        """Initializes every counter at zero."""
+        self.lines = 0
+        self.orders = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    # Return the loading rate.
+    def orders_per_second(self):
+        """
+        Returns the number of orders loaded per second so far.
+
+        Returns:
+            float: Orders per second, or 0.0 before any time has passed.
+        """
+        return self.orders / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.orders} orders, {self.errors} errors from {self.lines} lines "
+                f"in {self.elapsed:.2f}s ({self.orders_per_second():,.0f} orders/s)")
+
+# Look up a name in the same precompiled table the item classes validate with.
+def _member(table_name, valid, name, what):
+    member = TABLES[table_name].lookup(name) if isinstance(name, str) else None
+    if member is None or member.value is None:
+        raise ValueError(f"Pick a proper {what} from {valid}, not {name!r}.")
+    return member
+
+# Return a record's list field.
+def _names(record, key):
+    names = record.get(key, [])
+    if not isinstance(names, list):
+        raise ValueError(f"'{key}' must be a list.")
+    return names
+
+# Build one item from its JSON record.
+def parse_item(record):
+    """
+    Builds a `Drink`, `Food`, or `Blizzard` from a JSON record, validating every name against the class's `_valid_*` sets.
+
+    Records look like {"kind": "food", "base": "Hot Dog", "toppings": ["Ketchup"]}
+    or {"kind": "drink", "base": "Sprite", "size": "Small", "flavors": ["Lemon"]}.
+    Names are matched regardless of case.
+
+    Args:
+        record (dict): The item record.
+
+    Returns:
+        Drink, Food, or Blizzard: The new item.
+
+    Raises:
+        ValueError: If the record is malformed or names something that is not on the menu.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Each item must be a JSON object.")
+    kind = record.get("kind")
+    # A list or dict kind is unhashable, so check the type before the lookup.
+    cls = _CLASSES.get(kind) if isinstance(kind, str) else None
+    if cls is None:
+        raise ValueError(f"Pick a proper kind from {list(_CLASSES)}, not {kind!r}.")
+    base_table, mask_table, size_table = cls._price_tables
+    if cls is Drink:
+        item = Drink(_member(size_table, _VALID_SIZES, record.get("size"), "size"))
+        if "base" in record:
+            item.set_base(_member(base_table, Drink._valid_bases, record["base"], "base"))
+        item.set_flavors([_member(mask_table, Drink._valid_flavors, name, "flavor") for name in _names(record, "flavors")])
+    else:
+        item = cls()
+        if "base" in record:
+            item.set_base(_member(base_table, cls._valid_bases, record["base"], "base"))
+        item.set_toppings([_member(mask_table, cls._valid_toppings, name, "topping") for name in _names(record, "toppings")])
+    return item
+
+# Build one order from its JSON record.
+def parse_order(record):
+    """
+    Builds an `Order` from a JSON record like {"items": [...]}.
+
+    Args:
+        record (dict): The order record. See `parse_item` for the item records.
+
+    Returns:
+        Order: The new order.
+
+    Raises:
+        ValueError: If the record or any of its items is invalid.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Each order must be a JSON object.")
+    order = Order()
+    for item in _names(record, "items"):
+        order.add_item(parse_item(item))
+    return order
+
+# Turn an order back into a JSON record.
+def order_to_record(order):
+    """
+    Converts an `Order` into the JSON record `parse_order` reads.
+
+    Args:
+        order (Order): The order to convert.
+
+    Returns:
+        dict: The order record.
+    """
+    items = []
+    for item in order.get_items():
+        record = {"kind": KIND_NAMES[type(item)]}
+        base = item.get_base()
+        if isinstance(base, Enum):
+            base = base.value
+        if base is not None:
+            record["base"] = base
+        if isinstance(item, Drink):
+            record["size"] = str(item.get_size())
+            record["flavors"] = item.get_flavors()
+        else:
+            record["toppings"] = item.get_toppings()
+        items.append(record)
+    return {"items": items}
+
+# Write orders as JSON Lines.
+def dump_orders(orders, fp):
+    """
+    Writes orders to a text file as JSON Lines, one order per line.
+
+    Args:
+        orders (iterable): The `Order` objects to write.
+        fp (file-like): An open text file.
+    """
+    for order in orders:
+        fp.write(json.dumps(order_to_record(order)))
+        fp.write("\n")
+
+# Parse a run of lines into orders and line errors.
+def _parse_lines(first_line, lines):
+    results = []
+    for number, text in enumerate(lines, first_line):
+        if not text.strip():
+            continue
+        try:
+            results.append(parse_order(json.loads(text)))
+        except ValueError as error:
+            # json.JSONDecodeError is a ValueError too.
+            results.append(LineError(number, str(error)))
+    return results
+
+# Parse a run of lines; runs in the worker processes.
+def _parse_chunk(first_line, lines):
+    # Orders go back as batch columns, which pickle far smaller and faster than Order objects.
+    batch = OrderBatch()
+    errors = []
+    for result in _parse_lines(first_line, lines):
+        if isinstance(result, LineError):
+            # Kept with the number of orders before it, to restore the input order.
+            errors.append((len(batch), result))
+        else:
+            batch.append(result, priced=False)
+    return first_line + len(lines) - 1, batch, errors
+
+# Rebuild a worker's orders and merge its line errors back in, in input order.
+def _unpack_chunk(batch, errors):
+    orders = batch.iter_orders()
+    results = []
+    start = 0
+    for position, error in errors:
+        results.extend(islice(orders, position - start))
+        results.append(error)
+        start = position
+    results.extend(orders)
+    return results
+
+# Create class "OrderLoader"
+class OrderLoader:
+    """
+    Streams `Order` objects out of a JSON Lines file, validating them on a process pool.
+
+    The input is read lazily in chunks of `chunk_size` lines. At most
+    `max_pending` chunks are in flight at once, so memory stays bounded no
+    matter how large the file is. Results come back in input order. Workers
+    send their orders back as `OrderBatch` columns, which are rebuilt here.
+
+    Attributes:
+        workers (int): The number of worker processes; 0 parses in this process.
+        chunk_size (int): The number of lines sent to a worker at a time.
+        max_pending (int): The number of chunks allowed in flight.
+        stats (LoaderStats): Counters for the most recent `load` call.
+    """
+
+    def __init__(self, workers=None, chunk_size=1000, max_pending=None):
+        """
+        Initializes an `OrderLoader`.
+
+        Args:
+            workers (int): The number of worker processes. Defaults to the number of CPUs; 0 parses in this process.
+            chunk_size (int): The number of lines sent to a worker at a time.
+            max_pending (int): The number of chunks allowed in flight. Defaults to twice the number of workers.
+
+        Raises:
+            ValueError: If `chunk_size` is not positive.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.stats = LoaderStats()
+
+    # Read the input a chunk at a time.
+    def _chunks(self, fp):
+        first_line = 1
+        while True:
+            lines = list(islice(fp, self.chunk_size))
+            if not lines:
+                return
+            yield first_line, lines
+            first_line += len(lines)
+
+    # Stream orders and line errors out of a JSON Lines file.
+    def load(self, fp):
+        """
+        Reads a JSON Lines stream and yields one result per non-blank line, in input order.
+
+        Args:
+            fp (file-like): An open text file (or any iterable of lines) with one order record per line.
+
+        Yields:
+            Order or LineError: The order built from the line, or why it was rejected.
+        """
+        stats = self.stats = LoaderStats()
+        start = time.perf_counter()
+        for first_line, results in self._results(fp):
+            stats.lines = first_line
+            for result in results:
+                if isinstance(result, LineError):
+                    stats.errors += 1
+                else:
+                    stats.orders += 1
+                stats.elapsed = time.perf_counter() - start
+                yield result
+        stats.elapsed = time.perf_counter() - start
+
+    # Yield (lines read so far, results) for each chunk, in order.
+    def _results(self, fp):
+        if self.workers == 0:
+            for first_line, lines in self._chunks(fp):
+                yield first_line + len(lines) - 1, _parse_lines(first_line, lines)
+            return
+        tasks = ((_parse_chunk, first_line, lines) for first_line, lines in self._chunks(fp))
+        for last_line, batch, errors in iter_tasks(tasks, self.workers, self.max_pending):
+            yield last_line, _unpack_chunk(batch, errors)
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python -m api.loader orders.jsonl [workers]
+    loader = OrderLoader(workers=int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    with open(sys.argv[1], encoding="utf-8") as fp:
+        for result in loader.load(fp):
+            if isinstance(result, LineError):
+                print(f"line {result.line}: {result.message}", file=sys.stderr)
+    print(loader.stats)
@@ -0,0 +1,481 @@
+import json
+import random
+import time
+from array import array
+from bisect import bisect
+from itertools import accumulate
+
+from .blizzard import BlizzardFlavor, BlizzardTopping
+from .drinks import Drink, DrinkBase, Flavor, Size
+from .food import Foods, Topping
+from .loader import parse_item
+from .orders import Order
+
+# The kind names items are sampled as, matching `loader.KIND_NAMES`.
+KINDS = ("food", "drink", "blizzard")
+
+# The operations a trace is made of.
+OPERATIONS = ("create", "add", "edit", "remove", "receipt", "close")
+
+# Reported latency percentiles.
+PERCENTILES = (50, 90, 99, 99.9)
+
+# How close to an operation's scheduled time a paced run stops sleeping and spins, in nanoseconds.
+SPIN_NS = 200_000
+
+# Return equal weights for every member.
+def uniform(members):
+    """
+    Returns a popularity distribution where every member is equally likely.
+
+    Args:
+        members (iterable): The choices, e.g. enum members.
+
+    Returns:
+        dict: Maps each member to its weight.
+    """
+    return dict.fromkeys(members, 1.0)
+
+# Return weights that fall off by rank like Zipf's law.
+def zipf(members, exponent=1.0):
+    """
+    Returns a popularity distribution where the n-th member is picked in proportion to 1 / n ** exponent.
+
+    Args:
+        members (iterable): The choices, most popular first.
+        exponent (float): How steeply popularity falls off; 0 is uniform.
+
+    Returns:
+        dict: Maps each member to its weight.
+    """
+    return {member: 1 / rank ** exponent for rank, member in enumerate(members, 1)}
+
+# Create class "_Choice"
+class _Choice:
+    """A weighted choice with its cumulative weights computed once."""
+    __slots__ = ("members", "cum_weights", "total", "possible")
+
+    def __init__(self, weights, what):
+        """
+        Initializes a choice.
+
+        Args:
+            weights (dict): Maps each member to a non-negative weight.
+            what (str): What is being chosen, for error messages.
+
+        Raises:
+            ValueError: If a weight is negative or no weight is positive.
+        """
+        if any(weight < 0 for weight in weights.values()) or not sum(weights.values()) > 0:
+            raise ValueError(f"The {what} weights must be non-negative with at least one above zero.")
+        self.members = list(weights)
+        self.cum_weights = list(accumulate(weights.values()))
+        self.total = self.cum_weights[-1]
+        # The number of members that can be picked at all.
+        self.possible = sum(1 for weight in weights.values() if weight > 0)
+
+    # Pick one member.
+    def pick(self, rng):
+        return self.members[bisect(self.cum_weights, rng.random() * self.total, 0, len(self.members) - 1)]
+
+    # Pick up to `k` different members.
+    def pick_distinct(self, rng, k):
+        k = min(k, self.possible)
+        picked = []
+        while len(picked) < k:
+            member = self.pick(rng)
+            if member not in picked:
+                picked.append(member)
+        return picked
+
+# Create class "TrafficMix"
+class TrafficMix:
+    """
+    The popularity distributions a `LoadGenerator` samples traffic from.
+
+    Every distribution is a dict mapping choices to weights (see `uniform` and
+    `zipf`); anything left out uses the default. Bases and toppings default to
+    Zipf popularity in enum order, so the first members are the best sellers.
+
+    Attributes:
+        max_open (int): The most orders open at once; past it, orders are closed instead of created.
+    """
+
+    def __init__(self, operations=None, kinds=None, bases=None, extras=None, sizes=None, extra_counts=None, max_open=32):
+        """
+        Initializes a mix.
+
+        Args:
+            operations (dict): Weights of each of `OPERATIONS`.
+            kinds (dict): Weights of each of `KINDS`.
+            bases (dict): Maps a kind name to the weights of its bases (`Foods`, `DrinkBase` or `BlizzardFlavor` members).
+            extras (dict): Maps a kind name to the weights of its toppings or flavors.
+            sizes (dict): Weights of each drink `Size`.
+            extra_counts (dict): Weights of how many toppings or flavors a new item gets.
+            max_open (int): The most orders open at once.
+
+        Raises:
+            ValueError: If a distribution has a negative weight or none above zero, names an unknown operation or kind, or `max_open` is not positive.
+        """
+        if max_open < 1:
+            raise ValueError("max_open must be at least 1.")
+        self.max_open = max_open
+        default_bases = {
+            "food": zipf(list(Foods)[1:]),
+            "drink": zipf(list(DrinkBase)[1:]),
+            "blizzard": zipf(list(BlizzardFlavor)[1:]),
+        }
+        default_extras = {"food": zipf(Topping), "drink": zipf(Flavor), "blizzard": zipf(BlizzardTopping)}
+        bases = {**default_bases, **(bases or {})}
+        extras = {**default_extras, **(extras or {})}
+        self._operations = _Choice(operations or {"create": 1, "add": 3, "edit": 1, "remove": 0.5, "receipt": 1, "close": 1}, "operation")
+        unknown = set(self._operations.members) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Pick operations from {OPERATIONS}, not {sorted(unknown)}.")
+        self._kinds = _Choice(kinds or {"food": 2, "drink": 2, "blizzard": 1}, "kind")
+        unknown = set(self._kinds.members) - set(KINDS)
+        if unknown:
+            raise ValueError(f"Pick kinds from {KINDS}, not {sorted(unknown)}.")
+        self._bases = {kind: _Choice(weights, f"{kind} base") for kind, weights in bases.items()}
+        self._extras = {kind: _Choice(weights, f"{kind} topping") for kind, weights in extras.items()}
+        self._sizes = _Choice(sizes or uniform(list(Size)[1:]), "size")
+        self._extra_counts = _Choice(extra_counts or {0: 4, 1: 3, 2: 2, 3: 1}, "extra count")
+
+    # Sample one item as a loader record.
+    def sample_item(self, rng):
+        """
+        Samples an item configuration.
+
+        Args:
+            rng (random.Random): The random source.
+
+        Returns:
+            dict: The item as a record `loader.parse_item` reads.
+        """
+        kind = self._kinds.pick(rng)
+        record = {"kind": kind, "base": self._bases[kind].pick(rng).value}
+        extras = [member.value for member in self._extras[kind].pick_distinct(rng, self._extra_counts.pick(rng))]
+        if kind == "drink":
+            record["size"] = self._sizes.pick(rng).value
+            record["flavors"] = extras
+        else:
+            record["toppings"] = extras
+        return record
+
+    # Sample one topping or flavor for an item of a kind.
+    def sample_extra(self, rng, kind):
+        """
+        Samples a topping (or, for drinks, a flavor) to add to an item.
+
+        Args:
+            rng (random.Random): The random source.
+            kind (str): The item's kind name.
+
+        Returns:
+            str: The topping or flavor name.
+        """
+        return self._extras[kind].pick(rng).value
+
+# Create class "LoadGenerator"
+class LoadGenerator:
+    """
+    Generates traces of order traffic from a `TrafficMix`.
+
+    A trace is a list of operations, each a JSON-ready dict naming an order by
+    its key and an item by its position in that order. Every operation is valid
+    when the trace is run from the start, and the same seed always generates
+    the same trace.
+    """
+
+    def __init__(self, mix=None, seed=None):
+        """
+        Initializes a generator.
+
+        Args:
+            mix (TrafficMix): The distributions to sample from. Defaults to `TrafficMix()`.
+            seed (int): The random seed.
+        """
+        self.mix = mix or TrafficMix()
+        self.rng = random.Random(seed)
+        # Maps each open order's key to the kind name of each of its items, by position.
+        self._open = {}
+        self._keys = []
+        self._next_key = 0
+
+    # Generate the next operation.
+    def next_operation(self):
+        """
+        Samples the next operation, falling back to "create" (or "close", when too many orders are open) if the sampled one has nothing to act on.
+
+        Returns:
+            dict: The operation.
+        """
+        rng = self.rng
+        mix = self.mix
+        op = mix._operations.pick(rng)
+        key = rng.choice(self._keys) if self._keys else None
+        if key is None or (op in ("edit", "remove") and not self._open[key]) or (op == "create" and len(self._keys) >= mix.max_open):
+            op = "create" if len(self._keys) < mix.max_open else "close"
+        if op == "create":
+            key = self._next_key
+            self._next_key += 1
+            self._open[key] = []
+            self._keys.append(key)
+            return {"op": "create", "order": key}
+        items = self._open[key]
+        if op == "add":
+            record = mix.sample_item(rng)
+            items.append(record["kind"])
+            return {"op": "add", "order": key, "item": record}
+        if op == "edit":
+            index = rng.randrange(len(items))
+            return {"op": "edit", "order": key, "index": index, "extra": mix.sample_extra(rng, items[index])}
+        if op == "remove":
+            index = rng.randrange(len(items))
+            del items[index]
+            return {"op": "remove", "order": key, "index": index}
+        if op == "close":
+            del self._open[key]
+            self._keys.remove(key)
+        return {"op": op, "order": key}
+
+    # Generate a whole trace.
+    def generate(self, operations):
+        """
+        Generates a number of operations.
+
+        Args:
+            operations (int): The length of the trace.
+
+        Returns:
+            list: The operations.
+        """
+        return [self.next_operation() for _ in range(operations)]
+
+# Write a trace as JSON Lines.
+def save_trace(trace, fp, rate=None):
+    """
+    Records a trace to a text file: a header line with the target rate, then one operation per line.
+
+    Args:
+        trace (list): The operations.
+        fp (file-like): An open text file.
+        rate (float): The target rate the trace is meant to be run at, or None for as fast as possible.
+    """
+    fp.write(json.dumps({"rate": rate, "operations": len(trace)}))
+    fp.write("\n")
+    for op in trace:
+        fp.write(json.dumps(op))
+        fp.write("\n")
+
+# Read a trace written by save_trace.
+def load_trace(fp):
+    """
+    Reads a trace recorded by `save_trace`.
+
+    Args:
+        fp (file-like): An open text file.
+
+    Returns:
+        tuple: The operations and the recorded target rate.
+
+    Raises:
+        ValueError: If the file is not a recorded trace.
+    """
+    header = json.loads(fp.readline() or "null")
+    if not isinstance(header, dict) or "operations" not in header:
+        raise ValueError("Not a recorded trace: the first line must be its header.")
+    trace = [json.loads(line) for line in fp if line.strip()]
+    if len(trace) != header["operations"]:
+        raise ValueError(f"The trace is cut short: {len(trace)} of {header['operations']} operations.")
+    return trace, header["rate"]
+
+# Turn operations into calls, so the timed loop does no parsing.
+def _compile(trace):
+    steps = []
+    # Items are parsed once per distinct record and frozen, so orders share them like menu buttons would.
+    items = {}
+    for op in trace:
+        name = op["op"]
+        key = op["order"]
+        if name == "create":
+            def step(orders, key=key):
+                orders[key] = Order()
+        elif name == "add":
+            record = json.dumps(op["item"], sort_keys=True)
+            item = items.get(record)
+            if item is None:
+                item = items[record] = parse_item(op["item"]).freeze()
+            def step(orders, key=key, item=item):
+                orders[key].add_item(item)
+        elif name == "edit":
+            def step(orders, key=key, index=op["index"], extra=op["extra"]):
+                order = orders[key]
+                item = order.edit_item(order.get_item_ids()[index])
+                if isinstance(item, Drink):
+                    item.add_flavor(extra)
+                else:
+                    item.add_topping(extra)
+        elif name == "remove":
+            def step(orders, key=key, index=op["index"]):
+                order = orders[key]
+                order.remove_item_by_id(order.get_item_ids()[index])
+        elif name == "receipt":
+            def step(orders, key=key):
+                orders[key].get_receipt()
+        elif name == "close":
+            def step(orders, key=key):
+                del orders[key]
+        else:
+            raise ValueError(f"Pick operations from {OPERATIONS}, not {name!r}.")
+        steps.append((OPERATIONS.index(name), step))
+    return steps
+
+# Create class "LoadReport"
+class LoadReport:
+    """
+    Latencies of one run of a trace.
+
+    Attributes:
+        elapsed (float): Seconds from the first operation's start to the last one's end.
+        rate (float): The target rate, or None if the trace ran as fast as possible.
+        latencies (dict): Maps each operation name to an array of its latencies in nanoseconds, in trace order.
+    """
+
+    def __init__(self, elapsed, rate, latencies):
+        """Initializes a report; see the class attributes."""
+        self.elapsed = elapsed
+        self.rate = rate
+        self.latencies = latencies
+
+    # Return the number of operations run.
+    def get_count(self, op=None):
+        """
+        Returns the number of operations run.
+
+        Args:
+            op (str): One operation name, or None for every operation.
+
+        Returns:
+            int: The count.
+        """
+        return len(self.latencies[op]) if op is not None else sum(len(values) for values in self.latencies.values())
+
+    # Return the achieved rate.
+    def ops_per_second(self):
+        """
+        Returns the operations run per second.
+
+        Returns:
+            float: The achieved rate, or 0.0 if no time passed.
+        """
+        return self.get_count() / self.elapsed if self.elapsed else 0.0
+
+    # Return one latency percentile.
+    def percentile(self, q, op=None):
+        """
+        Returns a latency percentile by the nearest-rank method.
+
+        Args:
+            q (float): The percentile, from 0 to 100.
+            op (str): One operation name, or None for every operation.
+
+        Returns:
+            float: The latency in seconds, or 0.0 if no such operation ran.
+        """
+        values = sorted(self.latencies[op] if op is not None else (ns for values in self.latencies.values() for ns in values))
+        if not values:
+            return 0.0
+        rank = max(1, min(len(values), -(-len(values) * q // 100)))
+        return values[int(rank) - 1] / 1e9
+
+    # Return the percentiles of every operation.
+    def summary(self):
+        """
+        Returns the count and latency percentiles of each operation that ran, plus "all".
+
+        Returns:
+            dict: Maps each operation name to {"count", "p50", "p90", "p99", "p99.9", "max"}, latencies in seconds.
+        """
+        summary = {}
+        for op in [name for name in OPERATIONS if self.latencies[name]] + [None]:
+            row = {"count": self.get_count(op)}
+            for q in PERCENTILES:
+                row[f"p{q:g}"] = self.percentile(q, op)
+            row["max"] = self.percentile(100, op)
+            summary[op or "all"] = row
+        return summary
+
+    def __str__(self):
+        target = f"target {self.rate:,.0f}/s, " if self.rate else ""
+        lines = [f"{self.get_count()} operations in {self.elapsed:.2f}s ({target}achieved {self.ops_per_second():,.0f}/s)",
+                 f"{'op':>8} {'count':>8}" + "".join(f" {'p' + format(q, 'g'):>8}" for q in PERCENTILES) + f" {'max':>8}  (us)"]
+        for op, row in self.summary().items():
+            lines.append(f"{op:>8} {row['count']:>8}" + "".join(f" {value * 1e6:>8.1f}" for name, value in row.items() if name != "count"))
+        return "\n".join(lines)
+
+# Run a trace, optionally paced to a target rate.
+def run_trace(trace, rate=None):
+    """
+    Runs every operation of a trace against fresh orders and times each one.
+
+    With a target rate, operation i is scheduled `i / rate` seconds after the
+    start and its latency runs from that scheduled time, so time spent waiting
+    behind a slow operation counts too. Without one, operations run back to
+    back and the latency is just the call.
+
+    Args:
+        trace (list): The operations, e.g. from `LoadGenerator.generate` or `load_trace`.
+        rate (float): The target operations per second, or None for as fast as possible.
+
+    Returns:
+        LoadReport: The latencies.
+
+    Raises:
+        ValueError: If the rate is not positive or the trace names an unknown operation or item.
+    """
+    if rate is not None and rate <= 0:
+        raise ValueError("The target rate must be above zero.")
+    steps = _compile(trace)
+    latencies = [array("q") for _ in OPERATIONS]
+    orders = {}
+    clock = time.perf_counter_ns
+    interval = 1e9 / rate if rate else 0
+    began = clock()
+    for i, (op, step) in enumerate(steps):
+        start = clock()
+        if interval:
+            scheduled = began + int(i * interval)
+            # sleep() can overshoot by tens of microseconds, so spin for the last stretch.
+            if scheduled - start > SPIN_NS:
+                time.sleep((scheduled - start - SPIN_NS) / 1e9)
+            while clock() < scheduled:
+                pass
+            start = scheduled
+        step(orders)
+        latencies[op].append(clock() - start)
+    elapsed = (clock() - began) / 1e9
+    return LoadReport(elapsed, rate, dict(zip(OPERATIONS, latencies)))
+
+if __name__ == "__main__":
+    import argparse
+
+    # Usage: python -m api.loadgen [--operations N] [--rate R] [--seed S] [--record FILE | --replay FILE]
+    parser = argparse.ArgumentParser(description="Generate order traffic, or replay a recorded trace, and report latency percentiles.")
+    parser.add_argument("--operations", type=int, default=100_000, help="operations to generate (default 100,000)")
+    parser.add_argument("--rate", type=float, help="target operations per second (default: as fast as possible, or the recorded rate)")
+    parser.add_argument("--seed", type=int, default=1234, help="random seed (default 1234)")
+    parser.add_argument("--record", help="save the generated trace to this file")
+    parser.add_argument("--replay", help="run a recorded trace instead of generating one")
+    args = parser.parse_args()
+
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as fp:
+            trace, rate = load_trace(fp)
+        rate = args.rate or rate
+    else:
+        trace, rate = LoadGenerator(seed=args.seed).generate(args.operations), args.rate
+        if args.record:
+            with open(args.record, "w", encoding="utf-8") as fp:
+                save_trace(trace, fp, rate)
+    print(run_trace(trace, rate))
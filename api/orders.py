@@ -1,20 +1,88 @@
-from enum import Enum
+from itertools import islice
 
 # Drink assets
-from drinks import Drink
-from drinks import Size
+from .drinks import Drink
 
 # Food assets
-from food import Food
-from food import Foods
-from food import Topping
+from .food import Food
 
 # Blizzard assets
-from blizzard import Blizzard
-from blizzard import BlizzardFlavor
-from blizzard import BlizzardTopping
+from .blizzard import Blizzard
 
-import unittest
+from .pricing import COST_CACHE, price_many, to_dollars
+
+# Create class "_ItemStore"
+class _ItemStore:
+    """
+    The items and running subtotal behind an `Order`.
+
+    Items point their back-references at the store rather than at the order,
+    so a price change reaches the subtotal without the items keeping the order
+    alive. When the order is collected, the store drops those back-references
+    so the items do not keep it alive either.
+
+    Attributes:
+        _items (dict): Maps each item's ID to its `Drink`, `Food`, or `Blizzard` object, in the order they were added.
+        _subtotal (int): The running total of the items' prices in cents.
+        _priced (int): The `COST_CACHE.generation` the subtotal is current for.
+    """
+    __slots__ = ("_items", "_subtotal", "_priced")
+
+    def __init__(self, items, subtotal, priced=None):
+        """
+        Initializes a store for one order.
+
+        Args:
+            items (dict): The items, keyed by ID.
+            subtotal (int): Their total price in cents.
+            priced (int): The price generation the subtotal was computed under. Defaults to the current one.
+        """
+        self._items = items
+        # Kept current by the order's add and remove methods and by the items themselves.
+        self._subtotal = subtotal
+        self._priced = COST_CACHE.generation if priced is None else priced
+
+    # Drop the items' back-references once the order is gone.
+    def _release_items(self):
+        """
+        Removes every item's back-reference to the store, after the order it belongs to is collected.
+        """
+        for item in self._items.values():
+            if not item._frozen:
+                _detach(item, self)
+
+# Point an item's back-reference at a store, too.
+def _attach(item, store):
+    # Frozen items never change and may be shared by many orders, so they get none.
+    # Most items sit in one order, so a dict of stores (to the number of times
+    # each holds the item) is only used for repeats; removing from it is O(1).
+    if item._frozen:
+        return
+    orders = item._orders
+    if orders is None:
+        item._orders = store
+    elif type(orders) is dict:
+        orders[store] = orders.get(store, 0) + 1
+    elif orders is store:
+        item._orders = {store: 2}
+    else:
+        item._orders = {orders: 1, store: 1}
+
+# Drop one of an item's back-references to a store.
+def _detach(item, store):
+    orders = item._orders
+    if type(orders) is dict:
+        count = orders.pop(store, 0)
+        if count > 1:
+            orders[store] = count - 1
+        elif len(orders) == 1:
+            (other, count), = orders.items()
+            if count == 1:
+                item._orders = other
+        elif not orders:
+            item._orders = None
+    elif orders is store:
+        item._orders = None
 
 # Create class "Order"
 class Order:
@@ -22,12 +90,26 @@ class Order:
     A class representing an order of drinks, food, or Blizzards.
 
     Attributes:
-        _items (list): A list of `Drink`, `Food`, or `Blizzard` objects in the order.
+        _store (_ItemStore): The order's items and subtotal.
+        _next_id (int): The ID the next added item will get.
     """
-    # Give the class instance its _items property.
+    # No per-instance __dict__; these are the only attributes an instance has.
+    __slots__ = ("_store", "_next_id")
+
+    # Give the class instance its _store property.
     def __init__(self):
         """Initializes an empty order."""
-        self._items = []
+        self._store = _ItemStore({}, 0)
+        # IDs are never reused, so they stay valid after other items are removed.
+        self._next_id = 1
+
+    def __del__(self):
+        # Free the storage from its items' back-references, so items that outlive the order do not keep it alive.
+        self._store._release_items()
+
+    def __copy__(self):
+        # The default copy would share the storage, and release its items when collected.
+        return self.fork()
     
     # Return the list of items in this instance.
     def get_items(self):
@@ -37,7 +119,36 @@ class Order:
         Returns:
             list: A list of `Drink`, `Food`, or `Blizzard` objects.
         """
-        return self._items
+        return list(self._store._items.values())
+
+    # Return the IDs of the items in this instance.
+    def get_item_ids(self):
+        """
+        Returns the stable IDs of the items in the order, in the order they were added.
+
+        Returns:
+            list: A list of item IDs.
+        """
+        return list(self._store._items)
+
+    # Return one item by its ID.
+    def get_item(self, item_id):
+        """
+        Returns the item with a given ID.
+
+        Args:
+            item_id (int): The ID returned by `add_item`.
+
+        Returns:
+            Drink, Food, or Blizzard: The item.
+
+        Raises:
+            KeyError: If no item in the order has that ID.
+        """
+        try:
+            return self._store._items[item_id]
+        except KeyError:
+            raise KeyError(f"No item with ID {item_id} in this order.") from None
 
     # Return the number of items in this instance.
     def get_total(self):
@@ -47,18 +158,42 @@ class Order:
         Returns:
             int: The number of items in the order.
         """
-        return len(self._items)
+        return len(self._store._items)
     
-    # List out every item in the list.
-    def get_receipt(self):
+    # Return the running subtotal in cents.
+    def get_subtotal_cents(self):
         """
-        Generates a formatted receipt for the order.
+        Returns the order's subtotal without re-pricing any item, unless a price has changed since it was last totaled.
 
         Returns:
-            str: A formatted string representing the receipt.
+            int: The sum of the items' prices in cents.
+        """
+        store = self._store
+        if store._priced != COST_CACHE.generation:
+            store._subtotal = sum(item.calculate_cost_cents() for item in store._items.values())
+            store._priced = COST_CACHE.generation
+        return store._subtotal
+
+    # Return the running subtotal in dollars.
+    def get_subtotal(self):
+        """
+        Returns the order's subtotal without re-pricing any item.
+
+        Returns:
+            float: The sum of the items' prices.
+        """
+        return to_dollars(self.get_subtotal_cents())
+
+    # Yield the receipt one line at a time.
+    def iter_receipt(self):
         """
-        receipt = "Your order receipt:\n"
-        for i, item in enumerate(self._items):
+        Generates the order's receipt one line at a time, so it can be streamed.
+
+        Yields:
+            str: The next line of the receipt, ending in a newline.
+        """
+        yield "Your order receipt:\n"
+        for i, item in enumerate(self._store._items.values()):
             if isinstance(item, Drink):
                 base = item.get_base()
                 # Formats the "flavors" string like "Lemon, Mint, Blueberry"
@@ -66,7 +201,7 @@ class Order:
 
                 price = item.calculate_cost()
                 # Example: "1: Base - Root Beer, Flavors - Lemon, Cherry"
-                receipt += f"{i + 1}: Base - {base}, Flavors - {flavors}, Price - ${price}\n"
+                yield f"{i + 1}: Base - {base}, Flavors - {flavors}, Price - ${price}\n"
             elif isinstance(item, (Food, Blizzard)):
                 base = item.get_base()
                 # Formats the "flavors" string like "Lemon, Mint, Blueberry"
@@ -74,9 +209,50 @@ class Order:
 
                 price = item.calculate_cost()
                 # Example: "1: Base - Root Beer, Flavors - Lemon, Cherry"
-                receipt += f"{i + 1}: Base - {base}, Toppings - {flavors}, Price - ${price}\n"
-        return receipt
+                yield f"{i + 1}: Base - {base}, Toppings - {flavors}, Price - ${price}\n"
+
+    # Stream the receipt to a file-like object.
+    def write_receipt(self, fp):
+        """
+        Writes the order's receipt to a file-like object line by line, without building it in memory.
+
+        Args:
+            fp (file-like): Anything with a `write(str)` method, e.g. an open text file or `io.StringIO`.
+
+        Returns:
+            int: The number of lines written.
+        """
+        write = fp.write
+        count = 0
+        for line in self.iter_receipt():
+            write(line)
+            count += 1
+        return count
+
+    # List out every item in the list.
+    def get_receipt(self):
+        """
+        Generates a formatted receipt for the order.
+
+        Returns:
+            str: A formatted string representing the receipt.
+        """
+        return "".join(self.iter_receipt())
     
+    # Price every item in one pass.
+    def price_batch(self, prices=None):
+        """
+        Prices every item in the order in one pass with `price_many`.
+
+        Args:
+            prices (dict): Optional "what-if" changes, mapping a table name (e.g. "food.base") to {member: cents}.
+
+        Returns:
+            tuple: The price of each item in cents (an array) and the order total in cents.
+        """
+        lines = price_many(self._store._items.values(), prices)
+        return lines, sum(lines)
+
     # Add a Drink instance to the end of the list.
     def add_item(self, item):
         """
@@ -85,28 +261,183 @@ class Order:
         Args:
             item (Drink, Food, or Blizzard): The `Drink`, `Food`, or `Blizzard` object to add.
 
+        Returns:
+            int: The item's ID, which stays the same until the item is removed.
+
         Raises:
             ValueError: If the argument is not a `Drink`, `Food`, or `Blizzard` object.
         """
         if isinstance(item, (Drink, Food, Blizzard)):
-            self._items.append(item)
+            store = self._store
+            item_id = self._next_id
+            self._next_id += 1
+            store._subtotal += item.calculate_cost_cents()
+            store._items[item_id] = item
+            # Let the item report its own changes back to this order; the usual case is inlined.
+            if item._orders is None and not item._frozen:
+                item._orders = store
+            else:
+                _attach(item, store)
+            return item_id
         else:
             # If the instance is not a Drink, Food, or Blizzard, throw an error.
             raise ValueError("You can only add drinks, food, or Blizzards to this order.")
     
+    # Start a new order with the same items.
+    def fork(self):
+        """
+        Returns a new order with the same items, e.g. for "repeat my last order" or a split check. Same as `snapshot`.
+
+        Returns:
+            Order: The new order. New items get the same IDs in both orders.
+        """
+        return self.snapshot()
+
+    # Keep the order as it is now.
+    def snapshot(self):
+        """
+        Returns a copy of the order as it is now, e.g. for a held tab. Later changes to either order do not show in the other.
+
+        The snapshot holds frozen copies of the items (see `Food.freeze`), so
+        even changing one of this order's items directly does not reach it.
+        Identical items share one interned copy, so this is O(n) with no new
+        item objects for popular configurations. Change the snapshot's items
+        through `edit_item`, which copies only the item being edited.
+
+        Returns:
+            Order: The snapshot. It keeps the same item IDs.
+        """
+        store = self._store
+        order = type(self).__new__(type(self))
+        order._store = _ItemStore({item_id: item.freeze() for item_id, item in store._items.items()}, store._subtotal, store._priced)
+        order._next_id = self._next_id
+        return order
+
+    # Return an item that can be changed without touching any other order.
+    def edit_item(self, item_id):
+        """
+        Returns the item with a given ID, ready to be changed without affecting any other order.
+
+        A frozen item (as in a fork or snapshot), or one that another order also
+        holds, is first replaced under the same ID by a private copy. Only that
+        item is copied.
+
+        Args:
+            item_id (int): The ID returned by `add_item`.
+
+        Returns:
+            Drink, Food, or Blizzard: The editable item now in the order.
+
+        Raises:
+            KeyError: If no item in the order has that ID.
+        """
+        item = self.get_item(item_id)
+        store = self._store
+        if item._frozen:
+            copy = item.thaw()
+        elif type(item._orders) is dict:
+            _detach(item, store)
+            copy = type(item)._decode(*item._encode())
+            copy._cost = item.calculate_cost_cents()
+            copy._priced = item._priced
+        else:
+            return item
+        # Same configuration, same price, so the subtotal does not move.
+        store._items[item_id] = copy
+        _attach(copy, store)
+        return copy
+
+    # Swap a frozen item for an editable copy.
+    def thaw_item(self, item_id):
+        """
+        Replaces a frozen item with an editable copy under the same ID, so it can be changed. Same as `edit_item`.
+
+        Args:
+            item_id (int): The ID returned by `add_item`.
+
+        Returns:
+            Drink, Food, or Blizzard: The editable item now in the order.
+
+        Raises:
+            KeyError: If no item in the order has that ID.
+        """
+        return self.edit_item(item_id)
+
     # Remove a Drink instance from the list based on index.
     def remove_item(self, index):
         """
         Removes a `Drink`, `Food`, or `Blizzard` object from the order at the specified index.
 
+        This walks the items to find the index; prefer `remove_item_by_id`.
+
         Args:
             index (int): The index of the item to remove.
 
         Raises:
             IndexError: If the index is invalid.
         """
-        if 0 <= index < len(self._items):
-            self._items.pop(index)
+        if 0 <= index < len(self._store._items):
+            items = self._store._items
+            self._release(items.pop(next(islice(items, index, None))))
         else:
             # If the index is outside of the list, i.e. invalid, throw an error.
             raise IndexError("Invalid index, cannot remove item.")
+
+    # Remove an item by its ID.
+    def remove_item_by_id(self, item_id):
+        """
+        Removes the item with a given ID from the order in O(1).
+
+        Args:
+            item_id (int): The ID returned by `add_item`.
+
+        Returns:
+            Drink, Food, or Blizzard: The removed item.
+
+        Raises:
+            KeyError: If no item in the order has that ID.
+        """
+        item = self._store._items.pop(item_id, None)
+        if item is None:
+            raise KeyError(f"No item with ID {item_id} in this order.")
+        self._release(item)
+        return item
+
+    # Remove many items by ID in one pass.
+    def remove_items_by_id(self, item_ids):
+        """
+        Removes several items by ID. Nothing is removed unless every ID is in the order.
+
+        Args:
+            item_ids (iterable): IDs returned by `add_item`. Repeated IDs are removed once.
+
+        Returns:
+            list: The removed items, in the order their IDs were given.
+
+        Raises:
+            KeyError: If any ID is not in the order.
+        """
+        item_ids = dict.fromkeys(item_ids)
+        for item_id in item_ids:
+            if item_id not in self._store._items:
+                raise KeyError(f"No item with ID {item_id} in this order.")
+        items = self._store._items
+        removed = [items.pop(item_id) for item_id in item_ids]
+        for item in removed:
+            self._release(item)
+        return removed
+
+    # Take a removed item's price off the subtotal and drop its back-reference.
+    def _release(self, item):
+        """
+        Updates the subtotal and the item's back-reference after it leaves the order.
+
+        Args:
+            item (Drink, Food, or Blizzard): The item that was removed.
+        """
+        store = self._store
+        store._subtotal -= item.calculate_cost_cents()
+        if item._orders is store:
+            item._orders = None
+        elif not item._frozen:
+            _detach(item, store)
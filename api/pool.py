@@ -0,0 +1,54 @@
+import os
+from collections import deque
+
+from .pricing import get_prices, set_prices
+
+# Run tasks on a process pool and yield their results in submission order.
+def iter_tasks(tasks, workers=None, max_pending=None):
+    """
+    Runs tasks on a process pool, keeping a bounded number in flight, and yields each result in submission order.
+
+    Used by `settlement`, `analytics` and `loader` to spread files, shards or
+    chunks over worker processes while the results are used in this one. Every worker
+    starts with this process's current prices (see `get_prices`), even where
+    workers are spawned rather than forked and would otherwise load the menu
+    afresh.
+
+    Args:
+        tasks (iterable): Tuples of a picklable, module-level function followed by its arguments. Consumed lazily.
+        workers (int): The number of worker processes. Defaults to the number of CPUs; 0 runs every task in this process.
+        max_pending (int): The number of tasks allowed in flight. Defaults to twice the number of workers.
+
+    Yields:
+        The result of each task, in the order the tasks were given.
+    """
+    if workers == 0:
+        for task in tasks:
+            yield task[0](*task[1:])
+        return
+    # Imported here: the process pool machinery is slow to import and most callers never need it.
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=set_prices, initargs=(get_prices(),)) as pool:
+        max_pending = max_pending or 2 * workers
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(*task))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        for future in pending:
+            yield future.result()
+
+# Run tasks on a process pool and merge their results in submission order.
+def run_tasks(tasks, workers=None, max_pending=None, merge=None):
+    """
+    Runs tasks with `iter_tasks` and hands each result to `merge` in submission order.
+
+    Args:
+        tasks (iterable): Tuples of a picklable, module-level function followed by its arguments. Consumed lazily.
+        workers (int): The number of worker processes. Defaults to the number of CPUs; 0 runs every task in this process.
+        max_pending (int): The number of tasks allowed in flight. Defaults to twice the number of workers.
+        merge (callable): Called with each task's result, in the order the tasks were given.
+    """
+    for result in iter_tasks(tasks, workers, max_pending):
+        merge(result)
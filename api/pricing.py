@@ -0,0 +1,546 @@
+import os
+import sys
+from array import array
+from operator import attrgetter
+
+# Every compiled table, keyed by name (e.g. "food.base").
+TABLES = {}
+
+# Create class "PriceTable"
+class PriceTable:
+    """
+    A flat, integer-cent price table compiled from an enumeration.
+
+    Prices are stored in cents so that totals never pick up float drift. Each
+    enum member's ordinal is its position in declaration order, so pricing a
+    member is a single indexed lookup into `cents`.
+
+    Attributes:
+        name (str): The name the table is registered under in `TABLES`.
+        enum (type): The enumeration the table prices.
+        members (tuple): The enum members in declaration order.
+        ordinals (dict): Maps each enum member to its ordinal.
+        cents (array): The price of each member in cents, indexed by ordinal.
+        values (tuple): The value of each member, indexed by ordinal.
+
+    A set of members is represented as a bitmask, with bit `i` standing for the
+    member with ordinal `i`.
+    """
+
+    def __init__(self, name, enum, prices, register=True):
+        """
+        Compiles a price table and registers it under `name`.
+
+        Args:
+            name (str): The name to register the table under.
+            enum (type): The enumeration to compile.
+            prices (dict): Maps enum members to their price in cents. Members that are left out are free.
+            register (bool): Whether to register the table in `TABLES`.
+
+        Raises:
+            ValueError: If a price is given for something that is not a member of `enum`, or if a table is already registered under `name`.
+        """
+        # Items price through the table objects they were built with, so a second
+        # table under the same name would silently price differently from them.
+        if register and name in TABLES:
+            raise ValueError(f"A price table named {name!r} is already registered. Change its prices with set_price().")
+        self.name = name
+        self.enum = enum
+        self.members = tuple(enum)
+        self.ordinals = {member: i for i, member in enumerate(self.members)}
+        # The same, keyed by id(member): members are singletons, and an int key skips Enum's
+        # Python-level __hash__ in `price_many`.
+        self._ordinal_ids = {id(member): i for i, member in enumerate(self.members)}
+        for member in prices:
+            if member not in self.ordinals:
+                raise ValueError(f"{member!r} is not a member of {enum.__name__}.")
+        self.cents = array("l", (prices.get(member, 0) for member in self.members))
+        self.values = tuple(member.value for member in self.members)
+        # Every accepted spelling of a member, precompiled so the usual lookup is one
+        # dict probe (e.g. Size.SMALL, "Small", "small", "SMALL"). Other casings fall
+        # back to casefold() in `_find`.
+        self._index = dict(self.ordinals)
+        for i, value in enumerate(self.values):
+            self._index[value] = i
+            if isinstance(value, str):
+                for spelling in (value.casefold(), value.lower(), value.upper(), value.title()):
+                    self._index.setdefault(spelling, i)
+        self._members = {key: self.members[i] for key, i in self._index.items()}
+        self._bits = {key: 1 << i for key, i in self._index.items()}
+        self._subsets = None
+        if register:
+            TABLES[name] = self
+
+    # Return the price of one member.
+    def price(self, member):
+        """
+        Returns the price of an enum member.
+
+        Args:
+            member (Enum or str): A member of this table's enumeration, or its value.
+
+        Returns:
+            int: The price in cents.
+        """
+        i = self._index.get(member)
+        if i is None:
+            i = self._find(member)
+            if i is None:
+                raise KeyError(member)
+        return self.cents[i]
+
+    # Find an unusual spelling the precompiled index missed.
+    def _find(self, member):
+        """
+        Looks up a string in any casing; only reached when the one-probe lookup misses.
+
+        Args:
+            member: The key that missed.
+
+        Returns:
+            int: The member's ordinal, or None if `member` is not part of this table.
+        """
+        if type(member) is str:
+            return self._index.get(member.casefold())
+        return None
+
+    # Return the ordinal of one member.
+    def ordinal(self, member):
+        """
+        Returns the ordinal of an enum member.
+
+        Args:
+            member (Enum or str): A member of this table's enumeration, or its value.
+
+        Returns:
+            int: The member's ordinal, or None if `member` is not part of this table.
+        """
+        i = self._index.get(member)
+        return i if i is not None else self._find(member)
+
+    # Return the member for a member or value.
+    def lookup(self, member):
+        """
+        Returns the enum member for a member or one of its accepted values.
+
+        Args:
+            member (Enum or str): A member of this table's enumeration, or its value (e.g. "Sprite" or "sprite").
+
+        Returns:
+            Enum: The member, or None if `member` is not part of this table.
+        """
+        found = self._members.get(member)
+        if found is None:
+            i = self._find(member)
+            if i is not None:
+                found = self.members[i]
+        return found
+
+    # Return the bit standing for one member.
+    def bit(self, member):
+        """
+        Returns the bitmask bit for an enum member.
+
+        Args:
+            member (Enum or str): A member of this table's enumeration, or its value.
+
+        Returns:
+            int: The member's bit, or None if `member` is not part of this table.
+        """
+        found = self._bits.get(member)
+        if found is None:
+            i = self._find(member)
+            if i is not None:
+                found = 1 << i
+        return found
+
+    # Return the combined price of a set of members.
+    def price_mask(self, mask):
+        """
+        Returns the combined price of every member in a bitmask.
+
+        Args:
+            mask (int): A bitmask of members of this table's enumeration.
+
+        Returns:
+            int: The total price in cents.
+        """
+        cents = self.cents
+        total = 0
+        while mask:
+            low = mask & -mask
+            total += cents[low.bit_length() - 1]
+            mask ^= low
+        return total
+
+    # Turn a bitmask back into member values.
+    def decode(self, mask):
+        """
+        Decodes a bitmask into the values of its members, in declaration order.
+
+        Args:
+            mask (int): A bitmask of members of this table's enumeration.
+
+        Returns:
+            list: The values of the members in the mask (e.g. ["Ketchup", "Chili"]).
+        """
+        values = self.values
+        return [values[i] for i in range(mask.bit_length()) if mask >> i & 1]
+
+    # Return the price of every possible bitmask.
+    def subset_cents(self):
+        """
+        Returns the combined price of every possible bitmask, computed once and then reused.
+
+        Returns:
+            array: The price in cents of each bitmask, indexed by the mask itself.
+        """
+        if self._subsets is None:
+            subsets = array("l", [0])
+            for cents in self.cents:
+                subsets.extend([total + cents for total in subsets])
+            self._subsets = subsets
+        return self._subsets
+
+    # Change one price in place.
+    def set_price(self, member, cents):
+        """
+        Changes the price of one member. Price indexes built from this table are rebuilt on next use,
+        and items (frozen ones included) and order subtotals that cached a cost are repriced on their next read.
+
+        Args:
+            member (Enum or str): A member of this table's enumeration, or its value.
+            cents (int): The new price in cents.
+
+        Raises:
+            ValueError: If `member` is not part of this table.
+        """
+        i = self.ordinal(member)
+        if i is None:
+            raise ValueError(f"{member!r} is not a member of {self.enum.__name__}.")
+        self.cents[i] = cents
+        self._subsets = None
+        if TABLES.get(self.name) is self:
+            _INDEXES.clear()
+            COST_CACHE.generation += 1
+
+    # Return a copy of the table with some prices changed.
+    def repriced(self, changes):
+        """
+        Returns an unregistered copy of the table with some prices changed, for "what-if" pricing.
+
+        Args:
+            changes (dict): Maps enum members to their new price in cents.
+
+        Returns:
+            PriceTable: The changed copy.
+        """
+        prices = dict(zip(self.members, self.cents))
+        prices.update(changes)
+        return PriceTable(self.name, self.enum, prices, register=False)
+
+# Return every registered price.
+def get_prices():
+    """
+    Returns the prices in every registered table, e.g. to hand to another process with `set_prices`.
+
+    Returns:
+        dict: Maps each table name to its prices in cents, indexed by ordinal.
+    """
+    return {name: table.cents.tolist() for name, table in TABLES.items()}
+
+# Make the registered tables match prices from another process.
+def set_prices(prices):
+    """
+    Changes the registered tables to the prices from `get_prices`, with `PriceTable.set_price`, so only prices that differ are changed.
+
+    Args:
+        prices (dict): Maps table names to their prices in cents, indexed by ordinal.
+    """
+    for name, cents in prices.items():
+        table = TABLES[name]
+        for i, price in enumerate(cents):
+            if table.cents[i] != price:
+                table.set_price(table.members[i], price)
+
+# Stands in for a table an item does not have (e.g. a food's size).
+_FREE = array("l", [0])
+
+# Return a registered table, with any "what-if" changes applied.
+def _table(name, prices):
+    table = TABLES[name]
+    if prices and name in prices:
+        table = table.repriced(prices[name])
+    return table
+
+# Return the lookup arrays for one kind of item.
+def price_plan(names, prices=None):
+    """
+    Returns the lookup arrays that price one kind of item.
+
+    Args:
+        names (tuple): The names of the item's base, topping/flavor and size tables. The size table may be None.
+        prices (dict): Optional "what-if" changes, mapping a table name to {member: cents}.
+
+    Returns:
+        tuple: (base cents by ordinal, cents by topping/flavor bitmask, size cents by ordinal).
+    """
+    base, mask, size = names
+    return (
+        _table(base, prices).cents,
+        _table(mask, prices).subset_cents(),
+        _table(size, prices).cents if size is not None else _FREE,
+    )
+
+# Return what `price_many` needs to price one class of item.
+def _item_plan(cls, indexes, prices):
+    index = indexes.get(cls._price_tables)
+    if index is None:
+        index = indexes[cls._price_tables] = price_index(cls._price_tables, prices)
+    base_table, _, size_table = cls._price_tables
+    base, mask, size = cls._price_attrs
+    if size is None:
+        return index.cents, index._num_bases, index._bits, attrgetter(base, mask), TABLES[base_table]._ordinal_ids, None
+    return index.cents, index._num_bases, index._bits, attrgetter(base, mask, size), TABLES[base_table]._ordinal_ids, TABLES[size_table]._ordinal_ids
+
+# Price many items with one lookup each.
+def price_many(items, prices=None):
+    """
+    Prices many items at once.
+
+    Each item's base, bitmask and size are read straight from its slots and
+    priced with one lookup in its kind's `PriceIndex`, with no method calls
+    per item. Without `prices`, an item whose memoized cost is still current
+    is not looked up at all. The result is identical to calling
+    `calculate_cost_cents()` on each item, unless `prices` changes the menu.
+
+    Args:
+        items (iterable): The `Drink`, `Food`, or `Blizzard` objects to price.
+        prices (dict): Optional "what-if" changes, mapping a table name (e.g. "food.base") to {member: cents}.
+
+    Returns:
+        array: The price of each item in cents, in the same order as `items`.
+    """
+    # No item is priced under generation None, so "what-if" prices never use a memoized cost.
+    generation = None if prices else COST_CACHE.generation
+    indexes = {}
+    plans = {}
+    lines = []
+    append = lines.append
+    for item in items:
+        cost = item._cost
+        if cost is not None and item._priced == generation:
+            append(cost)
+            continue
+        cls = type(item)
+        plan = plans.get(cls)
+        if plan is None:
+            plan = plans[cls] = _item_plan(cls, indexes, prices)
+        cents, num_bases, bits, read, base_ordinals, size_ordinals = plan
+        if size_ordinals is None:
+            base, mask = read(item)
+            append(cents[base_ordinals[id(base)] << bits | mask])
+        else:
+            base, mask, size = read(item)
+            append(cents[(size_ordinals[id(size)] * num_bases + base_ordinals[id(base)]) << bits | mask])
+    return array("l", lines)
+
+# Where built price indexes are saved between runs; None turns saving off.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+
+# Built indexes for the registered tables, keyed by table names.
+_INDEXES = {}
+
+# Create class "PriceIndex"
+class PriceIndex:
+    """
+    The price of every configuration of one kind of item, in one flat array.
+
+    The menu is small (at most a few thousand base, bitmask and size
+    combinations per kind), so every price is worked out ahead of time and an
+    item is priced with a single lookup at `key(base, mask, size)`.
+
+    Attributes:
+        names (tuple): The names of the base, topping/flavor and size tables the index was built from.
+        fingerprint (str): A hash of those tables' members and prices.
+        cents (array): The price in cents of every configuration, indexed by `key`.
+    """
+    __slots__ = ("names", "fingerprint", "cents", "_num_bases", "_bits")
+
+    def __init__(self, names, prices=None):
+        """
+        Builds an index, or loads it from `CACHE_DIR` if it was saved with the same fingerprint.
+
+        Args:
+            names (tuple): The names of the item's base, topping/flavor and size tables. The size table may be None.
+            prices (dict): Optional "what-if" changes, mapping a table name to {member: cents}. An index with changes is never saved.
+        """
+        tables = [_table(name, prices) if name is not None else None for name in names]
+        base, mask, size = tables
+        self.names = tuple(names)
+        self.fingerprint = fingerprint(tables)
+        self._num_bases = len(base.cents)
+        self._bits = len(mask.cents)
+        length = (len(size.cents) if size is not None else 1) * self._num_bases << self._bits
+        persist = CACHE_DIR is not None and not (prices and any(name in prices for name in names))
+        path = os.path.join(CACHE_DIR, f"prices-{self.fingerprint}.bin") if persist else None
+        self.cents = _load(path, length) if persist else None
+        if self.cents is None:
+            self.cents = array("l")
+            mask_cents = mask.subset_cents()
+            for size_cents in (size.cents if size is not None else _FREE):
+                for base_cents in base.cents:
+                    offset = base_cents + size_cents
+                    self.cents.extend([offset + total for total in mask_cents])
+            if persist:
+                _save(path, self.cents)
+
+    # Return the position of one configuration.
+    def key(self, base, mask, size=0):
+        """
+        Returns the position of a configuration in `cents`.
+
+        Args:
+            base (int): The base ordinal.
+            mask (int): The topping or flavor bitmask.
+            size (int): The size ordinal (0 for items without a size).
+
+        Returns:
+            int: The index into `cents`.
+        """
+        return (size * self._num_bases + base) << self._bits | mask
+
+    # Return the price of one configuration.
+    def price(self, base, mask, size=0):
+        """
+        Returns the price of a configuration, as packed by an item's `_encode`.
+
+        Args:
+            base (int): The base ordinal.
+            mask (int): The topping or flavor bitmask.
+            size (int): The size ordinal (0 for items without a size).
+
+        Returns:
+            int: The price in cents.
+        """
+        return self.cents[(size * self._num_bases + base) << self._bits | mask]
+
+# Hash the tables an index is built from.
+def fingerprint(tables):
+    """
+    Returns a hash of the members and prices of some tables, which changes whenever any of them does.
+
+    Args:
+        tables (list): `PriceTable` objects, or None for a missing size table.
+
+    Returns:
+        str: A short hex digest.
+    """
+    # Imported here so importing the package does not load OpenSSL.
+    import hashlib
+    digest = hashlib.sha256(f"{array('l').itemsize}{sys.byteorder}".encode())
+    for table in tables:
+        if table is None:
+            digest.update(b"-")
+        else:
+            digest.update(repr((table.name, table.values)).encode())
+            digest.update(table.cents.tobytes())
+    return digest.hexdigest()[:24]
+
+# Read a saved index, or None if it is missing or damaged.
+def _load(path, length):
+    cents = array("l")
+    try:
+        with open(path, "rb") as fp:
+            cents.fromfile(fp, length)
+            if fp.read(1):
+                return None
+    except (OSError, EOFError):
+        return None
+    return cents
+
+# Save an index; a cache that cannot be written is simply skipped.
+def _save(path, cents):
+    temp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp, "wb") as fp:
+            cents.tofile(fp)
+        os.replace(temp, path)
+    except OSError:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+
+# Return the index for one kind of item.
+def price_index(names, prices=None):
+    """
+    Returns the price index for one kind of item, building it on first use.
+
+    Indexes for the registered tables are kept until a table is changed with
+    `PriceTable.set_price`, then rebuilt on the next call.
+
+    Args:
+        names (tuple): The names of the item's base, topping/flavor and size tables. The size table may be None.
+        prices (dict): Optional "what-if" changes, mapping a table name to {member: cents}.
+
+    Returns:
+        PriceIndex: The index.
+    """
+    if prices and any(name in prices for name in names):
+        return PriceIndex(names, prices)
+    index = _INDEXES.get(names)
+    if index is None:
+        index = _INDEXES[names] = PriceIndex(names)
+    return index
+
+# Create class "CacheStats"
+class CacheStats:
+    """
+    Counts hits and misses on the items' memoized costs.
+
+    Attributes:
+        hits (int): Cost reads answered from the cache.
+        misses (int): Cost reads that had to be recomputed.
+        generation (int): Bumped by every price change. Costs and subtotals cached under an older generation are repriced on their next read.
+    """
+
+    def __init__(self):
+        """Initializes both counters at zero."""
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    # Return the share of reads answered from the cache.
+    def hit_rate(self):
+        """
+        Returns the fraction of cost reads that were cache hits.
+
+        Returns:
+            float: The hit rate between 0.0 and 1.0, or 0.0 if nothing has been read yet.
+        """
+        reads = self.hits + self.misses
+        return self.hits / reads if reads else 0.0
+
+    # Set both counters back to zero.
+    def reset(self):
+        """Resets both counters to zero."""
+        self.hits = 0
+        self.misses = 0
+
+# Shared by every Food, Drink and Blizzard.
+COST_CACHE = CacheStats()
+
+# Convert a cent amount to dollars.
+def to_dollars(cents):
+    """
+    Converts a whole number of cents to dollars.
+
+    Args:
+        cents (int): An amount in cents.
+
+    Returns:
+        float: The amount in dollars (e.g. 350 -> 3.5).
+    """
+    return cents / 100
@@ -0,0 +1,228 @@
+import threading
+from contextlib import contextmanager
+from itertools import count
+
+from .batch import OrderBatch
+from .blizzard import Blizzard
+from .drinks import Drink
+from .food import Food
+from .orders import Order
+
+# Create class "OrderRegistry"
+class OrderRegistry:
+    """
+    A thread-safe registry of open orders, sharded by order ID.
+
+    Each shard has its own lock, so registers working on different orders
+    rarely wait on each other. Every read and change of a registered order
+    must go through the registry (or `edit`), which holds that order's shard
+    lock for the duration.
+
+    Items are frozen (see `Food.freeze`) on their way in. A mutable item keeps
+    back-references to every order holding it, so changing one held by orders
+    in two shards would update the other shard's order without its lock.
+    Frozen items have none. To change an item inside `edit`, use
+    `Order.edit_item`, which gives the order a private copy.
+
+    Attributes:
+        num_shards (int): The number of independently locked shards.
+    """
+
+    def __init__(self, shards=16):
+        """
+        Initializes an empty registry.
+
+        Args:
+            shards (int): The number of independently locked shards.
+
+        Raises:
+            ValueError: If `shards` is not positive.
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1.")
+        self.num_shards = shards
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._orders = [{} for _ in range(shards)]
+        # next() on a count is atomic, so IDs are unique without a lock.
+        self._ids = count(1)
+
+    # Return the lock and the orders of the shard holding an ID.
+    def _shard(self, order_id):
+        i = order_id % self.num_shards
+        return self._locks[i], self._orders[i]
+
+    # Register an order under a new ID.
+    def register(self, order=None):
+        """
+        Adds an order to the registry.
+
+        Args:
+            order (Order): The order to register. Defaults to a new, empty order. The registry keeps a copy with frozen items (see `Order.snapshot`).
+
+        Returns:
+            int: The order's ID.
+
+        Raises:
+            ValueError: If the argument is not an `Order`.
+        """
+        if order is None:
+            order = Order()
+        elif isinstance(order, Order):
+            order = order.snapshot()
+        else:
+            raise ValueError("Only orders can be registered.")
+        order_id = next(self._ids)
+        lock, orders = self._shard(order_id)
+        with lock:
+            orders[order_id] = order
+        return order_id
+
+    # Return the number of registered orders.
+    def __len__(self):
+        """
+        Returns the number of registered orders.
+
+        Returns:
+            int: The number of orders.
+        """
+        return sum(len(orders) for orders in self._orders)
+
+    # Hold an order's shard lock while it is changed.
+    @contextmanager
+    def edit(self, order_id):
+        """
+        Gives exclusive access to one order for a group of changes.
+
+        Use it as `with registry.edit(order_id) as order: ...`. Other orders in
+        the same shard wait until the block ends, so keep it short.
+
+        Args:
+            order_id (int): The ID returned by `register`.
+
+        Yields:
+            Order: The order.
+
+        Raises:
+            KeyError: If no order has that ID.
+        """
+        lock, orders = self._shard(order_id)
+        with lock:
+            order = orders.get(order_id)
+            if order is None:
+                raise KeyError(f"No order with ID {order_id} in the registry.")
+            yield order
+
+    # Add an item to a registered order.
+    def add_item(self, order_id, item):
+        """
+        Adds an item to a registered order.
+
+        Args:
+            order_id (int): The ID returned by `register`.
+            item (Drink, Food, or Blizzard): The item to add. The order gets its frozen copy (see `Food.freeze`).
+
+        Returns:
+            int: The item's ID within the order.
+
+        Raises:
+            KeyError: If no order has that ID.
+            ValueError: If the item is not a `Drink`, `Food`, or `Blizzard`.
+        """
+        if isinstance(item, (Drink, Food, Blizzard)):
+            item = item.freeze()
+        with self.edit(order_id) as order:
+            return order.add_item(item)
+
+    # Remove an item from a registered order.
+    def remove_item(self, order_id, item_id):
+        """
+        Removes an item from a registered order.
+
+        Args:
+            order_id (int): The ID returned by `register`.
+            item_id (int): The item's ID within the order.
+
+        Returns:
+            Drink, Food, or Blizzard: The removed item.
+
+        Raises:
+            KeyError: If no order or item has that ID.
+        """
+        with self.edit(order_id) as order:
+            return order.remove_item_by_id(item_id)
+
+    # Return a registered order's subtotal.
+    def get_subtotal_cents(self, order_id):
+        """
+        Returns a registered order's subtotal.
+
+        Args:
+            order_id (int): The ID returned by `register`.
+
+        Returns:
+            int: The subtotal in cents.
+
+        Raises:
+            KeyError: If no order has that ID.
+        """
+        with self.edit(order_id) as order:
+            return order.get_subtotal_cents()
+
+    # Return a registered order's receipt.
+    def get_receipt(self, order_id):
+        """
+        Returns a registered order's receipt, built while no other thread can change it.
+
+        Args:
+            order_id (int): The ID returned by `register`.
+
+        Returns:
+            str: The receipt.
+
+        Raises:
+            KeyError: If no order has that ID.
+        """
+        with self.edit(order_id) as order:
+            return order.get_receipt()
+
+    # Take an order out of the registry.
+    def remove(self, order_id):
+        """
+        Removes an order from the registry, e.g. once it is paid.
+
+        Args:
+            order_id (int): The ID returned by `register`.
+
+        Returns:
+            Order: The removed order. The caller now owns it.
+
+        Raises:
+            KeyError: If no order has that ID.
+        """
+        lock, orders = self._shard(order_id)
+        with lock:
+            order = orders.pop(order_id, None)
+        if order is None:
+            raise KeyError(f"No order with ID {order_id} in the registry.")
+        return order
+
+    # Copy every order at one instant.
+    def snapshot(self):
+        """
+        Copies every registered order as of a single instant.
+
+        Every shard lock is held (always taken in the same order) just long
+        enough to copy the orders into columns, so the copy never shows half of
+        a change and later changes do not affect it.
+
+        Returns:
+            tuple: The order IDs, in ascending order, and an `OrderBatch` holding the orders in the same order.
+        """
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            orders = sorted((pair for shard in self._orders for pair in shard.items()), key=lambda pair: pair[0])
+            return [order_id for order_id, _ in orders], OrderBatch.from_orders(order for _, order in orders)
+        finally:
+            for lock in self._locks:
+                lock.release()
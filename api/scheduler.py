@@ -0,0 +1,346 @@
+import heapq
+import time
+from itertools import count
+
+from .blizzard import Blizzard
+from .drinks import Drink, Size
+from .food import Food, Foods
+
+# Prep stations, in the order they are reported.
+STATIONS = ("fryer", "grill", "blizzard", "fountain")
+
+# The station that makes each food; Blizzards go to "blizzard" and drinks to "fountain".
+FOOD_STATIONS = {
+    Foods.HOT_DOG: "grill",
+    Foods.CORN_DOG: "fryer",
+    Foods.ICE_CREAM: "blizzard",
+    Foods.ONION_RINGS: "fryer",
+    Foods.FRIES: "fryer",
+    Foods.TOTS: "fryer",
+    Foods.NACHOS: "grill",
+}
+
+# Estimated prep times in seconds.
+FOOD_SECONDS = {
+    Foods.HOT_DOG: 90,
+    Foods.CORN_DOG: 180,
+    Foods.ICE_CREAM: 45,
+    Foods.ONION_RINGS: 200,
+    Foods.FRIES: 180,
+    Foods.TOTS: 190,
+    Foods.NACHOS: 60,
+}
+BLIZZARD_SECONDS = 75
+DRINK_SECONDS = {Size.SMALL: 15, Size.MEDIUM: 20, Size.LARGE: 25, Size.MEGA: 30}
+# Added for each topping or flavor.
+EXTRA_SECONDS = 5
+
+# Return the station and estimated prep time of one item.
+def route(item):
+    """
+    Returns where an item is made and roughly how long it takes.
+
+    Args:
+        item (Drink, Food, or Blizzard): The item.
+
+    Returns:
+        tuple: The station name and the estimated prep time in seconds.
+
+    Raises:
+        ValueError: If the item is not a `Drink`, `Food`, or `Blizzard`, or is a food with no base.
+    """
+    if isinstance(item, Food):
+        station = FOOD_STATIONS.get(item.get_base())
+        if station is None:
+            raise ValueError("Pick a base for the food before sending it to the kitchen.")
+        return station, FOOD_SECONDS[item.get_base()] + EXTRA_SECONDS * item.get_num_toppings()
+    if isinstance(item, Blizzard):
+        return "blizzard", BLIZZARD_SECONDS + EXTRA_SECONDS * item.get_num_toppings()
+    if isinstance(item, Drink):
+        return "fountain", DRINK_SECONDS[item.get_size()] + EXTRA_SECONDS * item.get_num_flavors()
+    raise ValueError("Only drinks, food, or Blizzards can be prepared.")
+
+# Create class "Ticket"
+class Ticket:
+    """
+    One item waiting at, or being made at, a prep station.
+
+    Attributes:
+        order_id (int): The kitchen's number for the order.
+        item_id (int): The item's ID within the order.
+        item (Drink, Food, or Blizzard): The item to make.
+        station (str): The station that makes it.
+        prep (float): The estimated prep time in seconds.
+        placed (float): When the order was submitted.
+        start_by (float): When to start so the item is ready with the rest of its order.
+    """
+    __slots__ = ("order_id", "item_id", "item", "station", "prep", "placed", "start_by")
+
+    def __init__(self, order_id, item_id, item, station, prep, placed, start_by):
+        """Initializes a ticket; see the class attributes."""
+        self.order_id = order_id
+        self.item_id = item_id
+        self.item = item
+        self.station = station
+        self.prep = prep
+        self.placed = placed
+        self.start_by = start_by
+
+# Create class "StationMetrics"
+class StationMetrics:
+    """
+    Counters for one prep station.
+
+    Attributes:
+        queued (int): Tickets sent to the station.
+        started (int): Tickets taken off its queue.
+        completed (int): Tickets finished.
+        total_wait (float): Seconds tickets spent queued, summed over started tickets.
+        max_wait (float): The longest a started ticket waited.
+    """
+    __slots__ = ("queued", "started", "completed", "total_wait", "max_wait")
+
+    def __init__(self):
+        """Initializes every counter at zero."""
+        self.queued = 0
+        self.started = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    # Return the average queue wait.
+    def mean_wait(self):
+        """
+        Returns the average time a started ticket spent queued.
+
+        Returns:
+            float: The mean wait in seconds, or 0.0 before any ticket has started.
+        """
+        return self.total_wait / self.started if self.started else 0.0
+
+# Create class "KitchenScheduler"
+class KitchenScheduler:
+    """
+    Splits orders into per-station priority queues of tickets.
+
+    Each station's queue is a heap ordered by start-by time: the order's submit
+    time plus its slowest item's prep time, minus the ticket's own prep time.
+    Older orders go first, and the items of one order are started so they are
+    ready together. Taking the next ticket is O(log n).
+
+    Attributes:
+        metrics (dict): Maps each station to its `StationMetrics`.
+        orders_completed (int): Orders whose every ticket is finished.
+        total_lead_time (float): Seconds from submit to last ticket finished, summed over completed orders.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Initializes an empty scheduler.
+
+        Args:
+            clock (callable): Returns the current time in seconds. Replace it to simulate a shift.
+        """
+        self.clock = clock
+        self.metrics = {station: StationMetrics() for station in STATIONS}
+        self.orders_completed = 0
+        self.total_lead_time = 0.0
+        self._queues = {station: [] for station in STATIONS}
+        # Maps each open order to [tickets not finished, tickets still queued, submit time].
+        self._open = {}
+        # Maps each cancelled order to its tickets still queued, which are skipped when popped.
+        self._cancelled = {}
+        self._order_ids = count(1)
+        # Breaks ties between equal start-by times in submission order.
+        self._sequence = count()
+        self._opened_at = None
+
+    # Split an order into tickets.
+    def submit(self, order, now=None):
+        """
+        Sends every item of an order to its station.
+
+        Args:
+            order (Order): The order to prepare.
+            now (float): The submit time. Defaults to the clock.
+
+        Returns:
+            int: The kitchen's number for the order.
+
+        Raises:
+            ValueError: If the order has no items, or any item cannot be routed. Nothing is queued in that case.
+        """
+        routes = [(item_id, item, *route(item)) for item_id, item in zip(order.get_item_ids(), order.get_items())]
+        # Every number handed out must name an open order that `cancel` accepts.
+        if not routes:
+            raise ValueError("An order with no items has nothing to prepare.")
+        if now is None:
+            now = self.clock()
+        if self._opened_at is None:
+            self._opened_at = now
+        order_id = next(self._order_ids)
+        ready_at = now + max(prep for *_, prep in routes)
+        for item_id, item, station, prep in routes:
+            ticket = Ticket(order_id, item_id, item, station, prep, now, ready_at - prep)
+            heapq.heappush(self._queues[station], (ticket.start_by, next(self._sequence), ticket))
+            self.metrics[station].queued += 1
+        self._open[order_id] = [len(routes), len(routes), now]
+        return order_id
+
+    # Take the most urgent ticket at a station.
+    def next_ticket(self, station, now=None):
+        """
+        Removes and returns the most urgent ticket at a station.
+
+        Args:
+            station (str): One of `STATIONS`.
+            now (float): When the ticket is started. Defaults to the clock.
+
+        Returns:
+            Ticket: The ticket, or None if the station has nothing queued.
+
+        Raises:
+            ValueError: If the station does not exist.
+        """
+        queue = self._queues.get(station)
+        if queue is None:
+            raise ValueError(f"Pick a proper station from {STATIONS}.")
+        while queue:
+            ticket = heapq.heappop(queue)[2]
+            if self._skip(ticket):
+                continue
+            self._open[ticket.order_id][1] -= 1
+            if now is None:
+                now = self.clock()
+            wait = now - ticket.placed
+            metrics = self.metrics[station]
+            metrics.started += 1
+            metrics.total_wait += wait
+            if wait > metrics.max_wait:
+                metrics.max_wait = wait
+            return ticket
+        return None
+
+    # Look at the most urgent ticket at a station without taking it.
+    def peek(self, station):
+        """
+        Returns the most urgent ticket at a station without removing it.
+
+        Args:
+            station (str): One of `STATIONS`.
+
+        Returns:
+            Ticket: The ticket, or None if the station has nothing queued.
+        """
+        queue = self._queues[station]
+        while queue and self._skip(queue[0][2]):
+            heapq.heappop(queue)
+        return queue[0][2] if queue else None
+
+    # Count a cancelled ticket as dropped and report whether to skip it.
+    def _skip(self, ticket):
+        left = self._cancelled.get(ticket.order_id)
+        if left is None:
+            return False
+        if left == 1:
+            del self._cancelled[ticket.order_id]
+        else:
+            self._cancelled[ticket.order_id] = left - 1
+        return True
+
+    # Mark a ticket as made.
+    def complete(self, ticket, now=None):
+        """
+        Records that a ticket is finished.
+
+        Args:
+            ticket (Ticket): A ticket returned by `next_ticket`.
+            now (float): When it was finished. Defaults to the clock.
+
+        Returns:
+            bool: True if this was the order's last ticket, so the order is ready.
+        """
+        state = self._open.get(ticket.order_id)
+        if state is None:
+            return False
+        if now is None:
+            now = self.clock()
+        self.metrics[ticket.station].completed += 1
+        state[0] -= 1
+        if state[0]:
+            return False
+        del self._open[ticket.order_id]
+        self.orders_completed += 1
+        self.total_lead_time += now - state[2]
+        return True
+
+    # Drop an order's remaining tickets.
+    def cancel(self, order_id):
+        """
+        Cancels an order. Its queued tickets are skipped when they reach the front of their queue.
+
+        Args:
+            order_id (int): The number returned by `submit`.
+
+        Raises:
+            KeyError: If the order is not open.
+        """
+        state = self._open.pop(order_id, None)
+        if state is None:
+            raise KeyError(f"No open order with number {order_id}.")
+        if state[1]:
+            self._cancelled[order_id] = state[1]
+
+    # Return the number of tickets waiting at a station.
+    def get_queue_depth(self, station):
+        """
+        Returns the number of tickets queued at a station, counting cancelled ones not yet skipped.
+
+        Args:
+            station (str): One of `STATIONS`.
+
+        Returns:
+            int: The queue depth.
+        """
+        return len(self._queues[station])
+
+    # Return the number of orders still being made.
+    def get_open_orders(self):
+        """
+        Returns the number of submitted orders that are not finished or cancelled.
+
+        Returns:
+            int: The number of open orders.
+        """
+        return len(self._open)
+
+    # Return the finish rate.
+    def throughput(self, station=None, now=None):
+        """
+        Returns tickets finished per second since the first order was submitted.
+
+        Args:
+            station (str): A station, or None for every station together.
+            now (float): The end of the period. Defaults to the clock.
+
+        Returns:
+            float: Tickets per second, or 0.0 before any time has passed.
+        """
+        if self._opened_at is None:
+            return 0.0
+        if now is None:
+            now = self.clock()
+        elapsed = now - self._opened_at
+        stations = STATIONS if station is None else (station,)
+        completed = sum(self.metrics[name].completed for name in stations)
+        return completed / elapsed if elapsed > 0 else 0.0
+
+    # Return the average time to make an order.
+    def mean_lead_time(self):
+        """
+        Returns the average time from submitting an order to finishing its last ticket.
+
+        Returns:
+            float: The mean lead time in seconds, or 0.0 before any order is finished.
+        """
+        return self.total_lead_time / self.orders_completed if self.orders_completed else 0.0
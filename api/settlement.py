@@ -0,0 +1,220 @@
+from enum import Enum
+from itertools import islice
+
+from .batch import KINDS, OrderBatch
+from .loader import KIND_NAMES, OrderLoader, LineError
+from .pool import run_tasks
+from .pricing import TABLES, to_dollars
+
+# Create class "Settlement"
+class Settlement:
+    """
+    End-of-day totals, in integer cents, that can be built in pieces and merged.
+
+    Every total is a sum of integers, so merging partial settlements in any
+    grouping gives exactly the same result as settling everything at once.
+
+    Attributes:
+        stores (dict): Maps each store to [orders, items, cents].
+        kinds (dict): Maps each item kind ("food", "drink", "blizzard") to [items, cents].
+        bases (dict): Maps each (kind, base) pair to [items, cents]. A base that was never set is None.
+    """
+
+    def __init__(self):
+        """Initializes an empty settlement."""
+        self.stores = {}
+        self.kinds = {}
+        self.bases = {}
+
+    # Add one order's items to the totals.
+    def add(self, store, order):
+        """
+        Prices an order's items with `calculate_cost_cents` and adds them to the totals.
+
+        Args:
+            store: Any hashable, sortable store identifier (e.g. a store number).
+            order (Order): The order to add.
+        """
+        store_totals = self.stores.setdefault(store, [0, 0, 0])
+        store_totals[0] += 1
+        for item in order.get_items():
+            cents = item.calculate_cost_cents()
+            kind = KIND_NAMES[type(item)]
+            base = item.get_base()
+            if isinstance(base, Enum):
+                base = base.value
+            store_totals[1] += 1
+            store_totals[2] += cents
+            for totals in (self.kinds.setdefault(kind, [0, 0]), self.bases.setdefault((kind, base), [0, 0])):
+                totals[0] += 1
+                totals[1] += cents
+
+    # Add a batch's rows to the totals.
+    def add_batch(self, stores, batch):
+        """
+        Prices every row of an `OrderBatch` with `OrderBatch.price` and adds them to the totals.
+
+        This gives the same totals as calling `add` on each order, without rebuilding any objects.
+
+        Args:
+            stores (list): The store of each order in the batch.
+            batch (OrderBatch): The orders to add.
+        """
+        lines = batch.price()
+        kind_names = [KIND_NAMES[cls] for cls in KINDS]
+        base_names = [TABLES[cls._price_tables[0]].values for cls in KINDS]
+        kinds, bases, offsets = batch.kinds, batch.bases, batch.offsets
+        for index, store in enumerate(stores):
+            store_totals = self.stores.setdefault(store, [0, 0, 0])
+            store_totals[0] += 1
+            for row in range(offsets[index], offsets[index + 1]):
+                cents = lines[row]
+                kind = kinds[row]
+                store_totals[1] += 1
+                store_totals[2] += cents
+                key = (kind_names[kind], base_names[kind][bases[row]])
+                for totals in (self.kinds.setdefault(key[0], [0, 0]), self.bases.setdefault(key, [0, 0])):
+                    totals[0] += 1
+                    totals[1] += cents
+
+    # Fold another settlement into this one.
+    def merge(self, other):
+        """
+        Adds another settlement's totals into this one.
+
+        Args:
+            other (Settlement): The partial settlement to fold in.
+
+        Returns:
+            Settlement: This settlement.
+        """
+        for mine, theirs in ((self.stores, other.stores), (self.kinds, other.kinds), (self.bases, other.bases)):
+            for key, counts in theirs.items():
+                totals = mine.get(key)
+                if totals is None:
+                    mine[key] = list(counts)
+                else:
+                    for i, count in enumerate(counts):
+                        totals[i] += count
+        return self
+
+    # Return the grand total.
+    def get_total_cents(self):
+        """
+        Returns the total sales across every store.
+
+        Returns:
+            int: The total in cents.
+        """
+        return sum(totals[2] for totals in self.stores.values())
+
+    # Return the totals in a stable, comparable form.
+    def to_dict(self):
+        """
+        Returns every total with its keys sorted, so equal settlements compare and print identically.
+
+        Returns:
+            dict: {"stores": {...}, "kinds": {...}, "bases": {...}, "total": dollars}.
+        """
+        # None sorts before any base name.
+        def key(pair):
+            kind, base = pair[0]
+            return kind, base is not None, base or ""
+        return {
+            "stores": {store: tuple(totals) for store, totals in sorted(self.stores.items())},
+            "kinds": {kind: tuple(totals) for kind, totals in sorted(self.kinds.items())},
+            "bases": {pair: tuple(totals) for pair, totals in sorted(self.bases.items(), key=key)},
+            "total": to_dollars(self.get_total_cents()),
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Settlement) and self.to_dict() == other.to_dict()
+
+# Settle one shard of columns; runs in the worker processes.
+def _settle_batch(stores, batch):
+    settlement = Settlement()
+    settlement.add_batch(stores, batch)
+    return settlement
+
+# Load and settle one archive; runs in the worker processes.
+def _settle_archive(store, path):
+    settlement = Settlement()
+    errors = []
+    with open(path, encoding="utf-8") as fp:
+        for result in OrderLoader(workers=0).load(fp):
+            if isinstance(result, LineError):
+                errors.append(result)
+            else:
+                settlement.add(store, result)
+    return settlement, errors
+
+# Split the input into lists of `size` pairs.
+def _shards(orders, size):
+    orders = iter(orders)
+    while True:
+        shard = list(islice(orders, size))
+        if not shard:
+            return
+        yield shard
+
+# Settle a day's orders across a process pool.
+def settle(orders, workers=None, shard_size=5000, max_pending=None):
+    """
+    Settles many orders, pricing shards of them on a process pool and merging the partial totals in shard order.
+
+    Each shard travels to its worker as a compact `OrderBatch` rather than as
+    pickled objects. This process only encodes the items into the batch's
+    columns; pricing and totaling them happen in the workers. Encoding is still
+    one pass over every item here, so the speedup levels off once the workers
+    outpace it; `settle_archives`, where workers read the orders themselves,
+    has no such limit. The answer does not depend on `workers` or `shard_size`.
+
+    Args:
+        orders (iterable): (store, `Order`) pairs.
+        workers (int): The number of worker processes. Defaults to the number of CPUs; 0 settles in this process.
+        shard_size (int): The number of orders sent to a worker at a time.
+        max_pending (int): The number of shards allowed in flight. Defaults to twice the number of workers.
+
+    Returns:
+        Settlement: The merged totals.
+
+    Raises:
+        ValueError: If `shard_size` is not positive.
+    """
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1.")
+    settlement = Settlement()
+    tasks = ((_settle_batch, [store for store, _ in shard], OrderBatch.from_orders((order for _, order in shard), priced=False))
+             for shard in _shards(orders, shard_size))
+    run_tasks(tasks, workers, max_pending, settlement.merge)
+    return settlement
+
+# Settle a day's JSON Lines archives across a process pool.
+def settle_archives(archives, workers=None, max_pending=None):
+    """
+    Settles JSON Lines order archives (see `loader`), loading and pricing each file in a worker process.
+
+    Nothing but the file path and the partial totals crosses between processes,
+    so this scales with the number of workers.
+
+    Args:
+        archives (iterable): (store, path) pairs, one per archive file.
+        workers (int): The number of worker processes. Defaults to the number of CPUs; 0 settles in this process.
+        max_pending (int): The number of files allowed in flight. Defaults to twice the number of workers.
+
+    Returns:
+        tuple: The merged `Settlement` and a list of (path, `LineError`) pairs for rejected lines.
+    """
+    settlement = Settlement()
+    errors = []
+    archives = list(archives)
+    paths = iter([path for _, path in archives])
+
+    def merge(result):
+        partial, file_errors = result
+        path = next(paths)
+        settlement.merge(partial)
+        errors.extend((path, error) for error in file_errors)
+
+    run_tasks(((_settle_archive, store, path) for store, path in archives), workers, max_pending, merge)
+    return settlement, errors
@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+# The repository root, which holds the api package.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from api.blizzard import Blizzard, BlizzardFlavor, BlizzardTopping
+from api.drinks import Drink, Flavor, Size
+from api.food import Food, Foods, Topping
+from api.orders import Order
+from api.scheduler import STATIONS, KitchenScheduler
+
+SEED = 1234
+ORDER_SIZES = (1, 10, 100, 1_000, 10_000, 100_000)
+QUICK_ORDER_SIZES = (1, 10, 100, 1_000)
+# Modules a fresh worker process might import, timed by the import cases.
+IMPORT_TARGETS = ("api", "api.orders", "api.loader", "api.settlement")
+
+# Every benchmark case, keyed by name.
+CASES = {}
+
+# Register a benchmark case.
+def case(name):
+    """
+    Registers a case. A case takes a seeded `random.Random` and returns (ops, run), where `run()` performs `ops` operations.
+
+    Args:
+        name (str): The case's name in the results.
+
+    Returns:
+        callable: The decorator.
+    """
+    def register(function):
+        CASES[name] = function
+        return function
+    return register
+
+# Build one seeded random item.
+def random_item(rng):
+    """
+    Builds a random, priced `Food`, `Drink`, or `Blizzard`.
+
+    Args:
+        rng (random.Random): The random source.
+
+    Returns:
+        Food, Drink, or Blizzard: The new item.
+    """
+    kind = rng.randrange(3)
+    if kind == 0:
+        item = Food()
+        item.set_base(rng.choice(list(Foods)[1:]))
+        item.set_toppings(rng.sample(list(Topping), rng.randrange(4)))
+    elif kind == 1:
+        item = Drink(rng.choice(list(Size)[1:]))
+        item.set_base(rng.choice(["Water", "Sprite", "Coca-Cola", "Dr. Pepper", "Starry", "Root Beer"]))
+        item.set_flavors([flavor.value for flavor in rng.sample(list(Flavor), rng.randrange(3))])
+    else:
+        item = Blizzard()
+        item.set_base(rng.choice(list(BlizzardFlavor)[1:]))
+        item.set_toppings(rng.sample(list(BlizzardTopping), rng.randrange(4)))
+    return item
+
+# Build a seeded random order.
+def random_order(rng, size):
+    """
+    Builds an order of `size` random items.
+
+    Args:
+        rng (random.Random): The random source.
+        size (int): The number of items.
+
+    Returns:
+        Order: The new order.
+    """
+    order = Order()
+    for _ in range(size):
+        order.add_item(random_item(rng))
+    return order
+
+@case("food.construct")
+def bench_food_construct(rng):
+    def run():
+        for _ in range(10_000):
+            item = Food()
+            item.set_base(Foods.HOT_DOG)
+            item.set_toppings([Topping.KETCHUP, Topping.MUSTARD])
+            item.add_topping(Topping.CHILI)
+    return 10_000, run
+
+@case("drink.construct")
+def bench_drink_construct(rng):
+    def run():
+        for _ in range(10_000):
+            item = Drink(Size.MEDIUM)
+            item.set_base("Sprite")
+            item.set_flavors(["Lemon", "Lime"])
+            item.add_flavor("Cherry")
+    return 10_000, run
+
+@case("blizzard.construct")
+def bench_blizzard_construct(rng):
+    def run():
+        for _ in range(10_000):
+            item = Blizzard()
+            item.set_base(BlizzardFlavor.SMORE)
+            item.set_toppings([BlizzardTopping.OREO, BlizzardTopping.CARAMEL])
+            item.add_topping(BlizzardTopping.CHERRY)
+    return 10_000, run
+
+@case("item.calculate_cost.cold")
+def bench_cost_cold(rng):
+    items = [random_item(rng) for _ in range(10_000)]
+
+    def run():
+        for item in items:
+            item._cost = None
+            item.calculate_cost()
+    return len(items), run
+
+@case("item.calculate_cost.warm")
+def bench_cost_warm(rng):
+    items = [random_item(rng) for _ in range(10_000)]
+
+    def run():
+        for item in items:
+            item.calculate_cost()
+    return len(items), run
+
+@case("scheduler.rush.2000")
+def bench_scheduler_rush(rng):
+    orders = [random_order(rng, rng.randint(1, 5)) for _ in range(2_000)]
+    # Foods without a base cannot be routed.
+    orders = [order for order in orders if not any(isinstance(item, Food) and item.get_base() is Foods.NULL for item in order.get_items())]
+    tickets = sum(order.get_total() for order in orders)
+
+    def run():
+        scheduler = KitchenScheduler(clock=lambda: 0.0)
+        for order in orders:
+            scheduler.submit(order)
+        for station in STATIONS:
+            while (ticket := scheduler.next_ticket(station)) is not None:
+                scheduler.complete(ticket)
+    return tickets, run
+
+# Register the per-size order cases.
+def order_cases(sizes):
+    """
+    Registers the add/remove and receipt cases for each order size.
+
+    Args:
+        sizes (tuple): The order sizes to benchmark.
+    """
+    for size in sizes:
+        def add_remove(rng, size=size):
+            items = [random_item(rng) for _ in range(size)]
+
+            def run():
+                order = Order()
+                ids = [order.add_item(item) for item in items]
+                for item_id in ids:
+                    order.remove_item_by_id(item_id)
+            return 2 * size, run
+
+        def remove_index(rng, size=size):
+            items = [random_item(rng) for _ in range(size)]
+
+            def run():
+                order = Order()
+                for item in items:
+                    order.add_item(item)
+                for _ in items:
+                    order.remove_item(0)
+            return 2 * size, run
+
+        def receipt(rng, size=size):
+            order = random_order(rng, size)
+            return 1, order.get_receipt
+
+        case(f"order.add_remove_by_id.{size}")(add_remove)
+        case(f"order.add_remove_by_index.{size}")(remove_index)
+        case(f"order.get_receipt.{size}")(receipt)
+
+# Register the import-time cases.
+def import_cases(targets):
+    """
+    Registers a case per module that starts a fresh interpreter and imports it, plus "import.python" for the bare interpreter to compare against.
+
+    Args:
+        targets (tuple): The modules to import.
+    """
+    for target in (None, *targets):
+        def run_import(rng, target=target):
+            command = [sys.executable, "-c", f"import {target}" if target else "pass"]
+
+            def run():
+                subprocess.run(command, cwd=ROOT, check=True)
+            return 1, run
+
+        case(f"import.{target or 'python'}")(run_import)
+
+# Time one case.
+def measure(name, repeat, target_ns=50_000_000):
+    """
+    Times a case `repeat` times and keeps the fastest run.
+
+    Fast cases are looped so each timed run lasts about `target_ns`, which keeps timer noise out of the results.
+
+    Args:
+        name (str): The case to run.
+        repeat (int): The number of timed runs.
+        target_ns (int): The rough length of one timed run in nanoseconds.
+
+    Returns:
+        dict: {"ns_per_op": float, "ops": int, "loops": int, "repeat": int}.
+    """
+    ops, run = CASES[name](random.Random(SEED))
+    start = time.perf_counter_ns()
+    run()
+    loops = max(1, target_ns // max(1, time.perf_counter_ns() - start))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            run()
+        best = min(best, time.perf_counter_ns() - start)
+    return {"ns_per_op": best / (ops * loops), "ops": ops, "loops": loops, "repeat": repeat}
+
+# Compare results against a saved baseline.
+def compare(results, baseline, threshold):
+    """
+    Prints each case's change against a baseline and lists the ones that got slower than `threshold` allows.
+
+    Args:
+        results (dict): The "results" of this run.
+        baseline (dict): The "results" of the saved run.
+        threshold (float): The allowed slowdown, e.g. 0.10 for 10%.
+
+    Returns:
+        list: The names of the cases that regressed.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<40} {result['ns_per_op']:>14,.1f} ns/op  (new)")
+            continue
+        ratio = result["ns_per_op"] / baseline[name]["ns_per_op"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {result['ns_per_op']:>14,.1f} ns/op  {ratio - 1:+8.1%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark item construction, pricing, receipts, order mutation and import time.")
+    parser.add_argument("--quick", action="store_true", help="only order sizes up to 1,000 and fewer repeats")
+    parser.add_argument("--repeat", type=int, help="timed runs per case (default 5, or 3 with --quick)")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved JSON result and exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    order_cases(QUICK_ORDER_SIZES if args.quick else ORDER_SIZES)
+    import_cases(IMPORT_TARGETS)
+    repeat = args.repeat or (3 if args.quick else 5)
+    names = [name for name in CASES if args.filter in name]
+    report = {
+        "meta": {"seed": SEED, "python": platform.python_version(), "implementation": platform.python_implementation(), "repeat": repeat},
+        "results": {name: measure(name, repeat) for name in names},
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+    elif not args.compare:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
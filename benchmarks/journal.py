@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# The repository root, which holds the api package.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from api.journal import Journal
+from bench import SEED, random_order
+
+# (max_batch, max_delay in seconds) pairs; (1, 0) commits and syncs every order on its own.
+WINDOWS = ((1, 0.0), (8, 0.0005), (32, 0.001), (64, 0.002), (256, 0.005))
+
+# Time a number of registers recording orders in one journal.
+def run(directory, threads, orders, max_batch, max_delay, sync):
+    """
+    Runs `threads` registers, each appending `orders` orders and waiting for every commit.
+
+    Args:
+        directory (str): Where to put the journal file.
+        threads (int): The number of register threads.
+        orders (int): The number of orders each register records.
+        max_batch (int): The journal's group size limit.
+        max_delay (float): The journal's commit window in seconds.
+        sync (bool): Whether commits call fsync.
+
+    Returns:
+        dict: {"orders_per_second": float, "commits": int, "mean_batch": float, "replay_seconds": float}.
+    """
+    path = os.path.join(directory, f"bench-{max_batch}-{max_delay}.journal")
+    rng = random.Random(SEED)
+    pool = [random_order(rng, rng.randint(1, 5)) for _ in range(256)]
+    start = threading.Event()
+
+    def register(journal, offset):
+        start.wait()
+        for i in range(orders):
+            journal.append(pool[(offset + i) % len(pool)])
+
+    with Journal(path, max_batch, max_delay, sync) as journal:
+        workers = [threading.Thread(target=register, args=(journal, n * 37)) for n in range(threads)]
+        for thread in workers:
+            thread.start()
+        began = time.perf_counter()
+        start.set()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - began
+    began = time.perf_counter()
+    Journal(path, sync=sync).close()
+    replayed = time.perf_counter() - began
+    os.remove(path)
+    return {
+        "orders_per_second": threads * orders / elapsed,
+        "commits": journal.stats.commits,
+        "mean_batch": journal.stats.mean_batch_size(),
+        "replay_seconds": replayed,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure journal throughput at different group commit windows.")
+    parser.add_argument("--threads", type=int, default=64, help="register threads appending at once (default 64)")
+    parser.add_argument("--orders", type=int, default=100, help="orders per register thread (default 100)")
+    parser.add_argument("--no-sync", action="store_true", help="skip fsync, to see the cost of the writes alone")
+    parser.add_argument("--dir", help="put the journal here instead of a temporary directory (use the disk you care about)")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    sync = not args.no_sync
+    results = {}
+    print(f"python {platform.python_version()}, {args.threads} threads, fsync {'on' if sync else 'off'}")
+    print(f"{'max_batch':>9} {'max_delay':>10} {'orders/s':>10} {'commits':>8} {'batch':>6} {'replay s':>9}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for max_batch, max_delay in WINDOWS:
+            result = run(directory, args.threads, args.orders, max_batch, max_delay, sync)
+            results[f"{max_batch}/{max_delay}"] = result
+            print(f"{max_batch:>9} {max_delay * 1000:>8.1f}ms {result['orders_per_second']:>10,.0f} "
+                  f"{result['commits']:>8} {result['mean_batch']:>6.1f} {result['replay_seconds']:>9.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump({"meta": {"python": platform.python_version(), "threads": args.threads, "sync": sync}, "results": results}, fp, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import os
+import sys
+import tracemalloc
+import types
+
+# The repository root, which holds the api package.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from api.blizzard import Blizzard, BlizzardFlavor, BlizzardTopping
+from api.drinks import Drink, Size
+from api.food import Food, Foods, Topping
+from api.orders import Order
+
+# Rebuild a slotted class the way it was laid out before __slots__.
+def legacy_layout(cls, **rebind):
+    """
+    Rebuilds a slotted class without `__slots__`, so its instances carry a `__dict__` again.
+
+    Args:
+        cls (type): A class that defines `__slots__`.
+        **rebind: Global names to swap inside the copied methods (e.g. `Food=LegacyFood`), so `isinstance` checks see the rebuilt classes.
+
+    Returns:
+        type: A class with the same methods and class attributes but a per-instance `__dict__`.
+    """
+    skip = {"__slots__", "__dict__", "__weakref__", *cls.__slots__}
+    namespace = {}
+    for name, value in vars(cls).items():
+        if name in skip:
+            continue
+        if isinstance(value, types.FunctionType) and rebind:
+            value = types.FunctionType(value.__code__, {**value.__globals__, **rebind}, value.__name__, value.__defaults__, value.__closure__)
+        namespace[name] = value
+    return type(cls.__name__, cls.__bases__, namespace)
+
+# Build one priced item of a given kind.
+def make_item(kind, food_cls, drink_cls, blizzard_cls):
+    """
+    Builds a typical priced item: a `Food` for kind 0, a `Drink` for kind 1 and a `Blizzard` for kind 2.
+
+    Returns:
+        Food, Drink, or Blizzard: The priced item.
+    """
+    if kind == 0:
+        item = food_cls()
+        item.set_base(Foods.HOT_DOG)
+        item.set_toppings([Topping.KETCHUP, Topping.MUSTARD])
+    elif kind == 1:
+        item = drink_cls(Size.MEDIUM)
+        item.set_base("Sprite")
+        item.add_flavor("Lemon")
+    else:
+        item = blizzard_cls()
+        item.set_base(BlizzardFlavor.VANILLA)
+        item.add_topping(BlizzardTopping.OREO)
+    item.calculate_cost()
+    return item
+
+# Measure the bytes allocated while building something.
+def measure(build):
+    """
+    Returns the bytes still allocated after calling `build`, which must return what it built.
+
+    Args:
+        build (callable): Builds and returns the objects to measure.
+
+    Returns:
+        int: The bytes allocated by `build` that are still alive.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+# Report bytes per item and per order for one layout.
+def run(label, food_cls, drink_cls, blizzard_cls, order_cls, count=10_000):
+    """
+    Prints the bytes per item and per `count`-item order for one class layout.
+
+    Args:
+        label (str): The name of the layout.
+        food_cls, drink_cls, blizzard_cls, order_cls (type): The classes to measure.
+        count (int): The number of items in the measured order.
+    """
+    holder = [None] * count
+
+    def items():
+        for i in range(count):
+            holder[i] = make_item(i % 3, food_cls, drink_cls, blizzard_cls)
+        return holder
+
+    def order():
+        result = order_cls()
+        for i in range(count):
+            result.add_item(make_item(i % 3, food_cls, drink_cls, blizzard_cls))
+        return result
+
+    per_item = measure(items) / count
+    per_order = measure(order)
+    print(f"{label:>8}: {per_item:8.1f} bytes/item  {per_order:12,} bytes per {count:,}-item order")
+
+if __name__ == "__main__":
+    LegacyFood = legacy_layout(Food)
+    LegacyDrink = legacy_layout(Drink)
+    LegacyBlizzard = legacy_layout(Blizzard)
+    LegacyOrder = legacy_layout(Order, Food=LegacyFood, Drink=LegacyDrink, Blizzard=LegacyBlizzard)
+    run("before", LegacyFood, LegacyDrink, LegacyBlizzard, LegacyOrder)
+    run("after", Food, Drink, Blizzard, Order)
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+
+# The repository root, which holds the api package.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from api.registry import OrderRegistry
+from bench import SEED, random_item
+
+THREAD_COUNTS = (1, 2, 4, 8)
+
+# Run one register's share of the work.
+def register_loop(registry, items, orders, start):
+    """
+    Opens `orders` orders, adds three items to each, edits one, prints the receipt and closes the order.
+
+    Args:
+        registry (OrderRegistry): The shared registry.
+        items (list): Prebuilt items to draw from.
+        orders (int): The number of orders to process.
+        start (threading.Event): Set once every thread is ready.
+    """
+    start.wait()
+    for i in range(orders):
+        order_id = registry.register()
+        item_ids = [registry.add_item(order_id, items[(i + j) % len(items)].freeze()) for j in range(3)]
+        registry.remove_item(order_id, item_ids[0])
+        registry.get_receipt(order_id)
+        registry.remove(order_id)
+
+# Time a number of registers sharing one registry.
+def run(threads, shards, orders, snapshots):
+    """
+    Runs `threads` registers against one registry, optionally with a reporting thread taking snapshots.
+
+    Args:
+        threads (int): The number of register threads.
+        shards (int): The registry's shard count; 1 behaves like a single global lock.
+        orders (int): The number of orders each register processes.
+        snapshots (bool): Whether a reporting thread snapshots the registry while the registers run.
+
+    Returns:
+        dict: {"orders_per_second": float, "snapshots": int}.
+    """
+    registry = OrderRegistry(shards)
+    rng = random.Random(SEED)
+    items = [random_item(rng) for _ in range(64)]
+    start = threading.Event()
+    workers = [threading.Thread(target=register_loop, args=(registry, items, orders, start)) for _ in range(threads)]
+    done = threading.Event()
+    taken = [0]
+
+    def report():
+        start.wait()
+        while not done.is_set():
+            registry.snapshot()
+            taken[0] += 1
+
+    reporter = threading.Thread(target=report) if snapshots else None
+    for thread in workers:
+        thread.start()
+    if reporter:
+        reporter.start()
+    began = time.perf_counter()
+    start.set()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    done.set()
+    if reporter:
+        reporter.join()
+    return {"orders_per_second": threads * orders / elapsed, "snapshots": taken[0]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress the order registry with concurrent register threads.")
+    parser.add_argument("--orders", type=int, default=5_000, help="orders per register thread (default 5,000)")
+    parser.add_argument("--shards", type=int, default=16, help="shards in the sharded registry (default 16)")
+    parser.add_argument("--snapshots", action="store_true", help="also run a reporting thread that snapshots continuously")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    # Without a GIL, threads run in parallel and the sharded registry is where the difference shows.
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    results = {}
+    print(f"python {platform.python_version()}, GIL {'on' if gil else 'off'}, {os.cpu_count()} CPUs")
+    print(f"{'threads':>7} {'global lock':>14} {'sharded':>14}  orders/s")
+    for threads in THREAD_COUNTS:
+        single = run(threads, 1, args.orders, args.snapshots)
+        sharded = run(threads, args.shards, args.orders, args.snapshots)
+        results[threads] = {"global_lock": single, "sharded": sharded}
+        print(f"{threads:>7} {single['orders_per_second']:>14,.0f} {sharded['orders_per_second']:>14,.0f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump({"meta": {"python": platform.python_version(), "gil": gil, "cpus": os.cpu_count()}, "results": results}, fp, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,98 @@
 from enum import Enum
+import asyncio
+import copy
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
 
 # Drink assets
-from ..api.drinks import Drink
-from ..api.drinks import Size
+from api.drinks import Drink
+from api.drinks import Size
 
 # Food assets
-from ..api.food import Food
-from ..api.food import Foods
-from ..api.food import Topping
+from api.food import Food
+from api.food import Foods
+from api.food import Topping
 
 # Blizzard assets
-from ..api.blizzard import Blizzard
-from ..api.blizzard import BlizzardFlavor
-from ..api.blizzard import BlizzardTopping
+from api.blizzard import Blizzard
+from api.blizzard import BlizzardFlavor
+from api.blizzard import BlizzardTopping
 
 # Order assets
-from ..api.orders import Order
+from api.orders import Order
+
+# Analytics assets
+from api.analytics import SalesRollup
+from api.analytics import rollup_archives
+
+# Archive assets
+from api.archive import ArchiveReader
+from api.archive import write_archive
+
+# Batch assets
+from api.batch import KIND_DRINK
+from api.batch import KIND_FOOD
+from api.batch import OrderBatch
+
+# Instrumentation assets
+from api import instrument
+
+# Intake assets
+from api.intake import IntakeService
+
+# Journal assets
+from api.journal import Journal
+from api.journal import replay
+
+# Loader assets
+from api.loader import LineError
+from api.loader import OrderLoader
+from api.loader import dump_orders
+
+# Load generator assets
+from api.loadgen import LoadGenerator
+from api.loadgen import TrafficMix
+from api.loadgen import load_trace
+from api.loadgen import run_trace
+from api.loadgen import save_trace
+
+# Registry assets
+from api.registry import OrderRegistry
+
+# Scheduler assets
+from api.scheduler import KitchenScheduler
+
+# Settlement assets
+from api.settlement import Settlement
+from api.settlement import settle
+
+# Pricing assets
+from api import pricing
+from api.pricing import COST_CACHE
+from api.pricing import PriceIndex
+from api.pricing import price_index
+from api.pricing import price_many
 
 import unittest
 
 class MethodTests(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # Keep price indexes saved during the tests out of the package's __pycache__.
+        cls.cache_dir = pricing.CACHE_DIR
+        cls.cache_tmp = tempfile.TemporaryDirectory()
+        pricing.CACHE_DIR = cls.cache_tmp.name
+
+    @classmethod
+    def tearDownClass(cls):
+        pricing.CACHE_DIR = cls.cache_dir
+        cls.cache_tmp.cleanup()
+
     def test_drink(self):
         item = Drink(Size.SMALL)
         item.set_base("Sprite")
@@ -69,5 +141,589 @@ class MethodTests(unittest.TestCase):
         
         print(order.get_receipt())
 
+    def test_cost_cache(self):
+        item = Food()
+        item.set_base(Foods.FRIES)
+        COST_CACHE.reset()
+        self.assertEqual(item.calculate_cost(), 1.50)
+        self.assertEqual(item.calculate_cost(), 1.50)
+        self.assertEqual((COST_CACHE.hits, COST_CACHE.misses), (1, 1))
+        item.add_topping(Topping.CHILI)
+        self.assertEqual(item.calculate_cost(), 2.10, "Adding a topping should invalidate the cached cost.")
+        self.assertEqual(COST_CACHE.misses, 2)
+
+    def test_topping_mask(self):
+        item = Food()
+        item.set_toppings([Topping.CHILI, Topping.KETCHUP])
+        item.add_topping(Topping.KETCHUP)
+        self.assertEqual(item.get_toppings(), ["Ketchup", "Chili"])
+        self.assertEqual(item.get_num_toppings(), 2)
+        self.assertTrue(item.has_topping(Topping.CHILI))
+        self.assertFalse(item.has_topping(Topping.BACON))
+
+        drink = Drink(Size.SMALL)
+        drink.set_flavors(["lime", "Lemon"])
+        self.assertEqual(drink.get_flavors(), ["Lemon", "Lime"])
+        with self.assertRaises(ValueError):
+            drink.add_flavor("Grape")
+
+    def test_order_batch(self):
+        order = Order()
+        item = Drink(Size.LARGE)
+        item.set_base("root beer")
+        item.set_flavors(["Cherry"])
+        order.add_item(item)
+        item = Food()
+        item.set_base(Foods.NACHOS)
+        item.set_toppings([Topping.CHEESE, Topping.CHILI])
+        order.add_item(item)
+
+        batch = OrderBatch.from_orders([order, Order(), order])
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.get_num_items(), 4)
+        self.assertEqual(batch.get_order_cents(0), 220 + 280)
+        self.assertEqual(batch.get_total_cents(), 2 * 500)
+        copy = batch.get_order(2)
+        self.assertEqual(copy.get_receipt(), order.get_receipt())
+        self.assertEqual(copy.get_items()[0].get_base(), "Root Beer")
+        unpriced = OrderBatch.from_orders([order, Order(), order], priced=False)
+        self.assertEqual((len(unpriced.cents), list(unpriced.offsets)), (0, list(batch.offsets)))
+        self.assertEqual(list(unpriced.price()), list(batch.cents))
+        self.assertEqual((unpriced.get_order_cents(0), unpriced.get_total_cents()), (batch.get_order_cents(0), batch.get_total_cents()))
+        rollup = SalesRollup()
+        rollup.add_batch(OrderBatch.from_orders([order], priced=False))
+        self.assertEqual(rollup.get_total_cents(), batch.get_order_cents(0))
+        unpriced.append(order)
+        self.assertEqual(list(unpriced.get_order_totals()), list(batch.get_order_totals()) + [batch.get_order_cents(0)])
+
+    def test_price_many(self):
+        items = []
+        for base in list(Foods)[1:]:
+            item = Food()
+            item.set_base(base)
+            item.set_toppings(list(Topping)[:len(base.name) % 9])
+            items.append(item)
+        for size in list(Size)[1:]:
+            item = Drink(size)
+            item.set_flavors(["Mint", "Lime"])
+            items.append(item)
+        item = Blizzard()
+        item.set_base(BlizzardFlavor.BANANA)
+        item.set_toppings(list(BlizzardTopping))
+        items.append(item)
+        self.assertEqual(list(price_many(items)), [item.calculate_cost_cents() for item in items])
+
+        order = Order()
+        order.add_item(items[0])
+        lines, total = order.price_batch({"food.base": {Foods.HOT_DOG: 250}})
+        self.assertEqual(total, items[0].calculate_cost_cents() + 20)
+        batch = OrderBatch.from_orders([order])
+        self.assertEqual(list(batch.price()), list(batch.cents))
+        self.assertEqual(list(batch.get_order_totals(batch.price({"food.base": {Foods.HOT_DOG: 250}}))), [total])
+
+    def test_subtotal(self):
+        order = Order()
+        food = Food()
+        food.set_base(Foods.CORN_DOG)
+        order.add_item(food)
+        drink = Drink(Size.MEGA)
+        order.add_item(drink)
+        order.add_item(drink)
+        self.assertEqual(order.get_subtotal_cents(), 200 + 2 * 215)
+
+        food.add_topping(Topping.BACON)
+        drink.add_flavor("Mint")
+        self.assertEqual(order.get_subtotal_cents(), 230 + 2 * 230)
+        order.remove_item(1)
+        self.assertEqual(order.get_subtotal_cents(), 230 + 230)
+        order.remove_item(1)
+        drink.add_flavor("Lime")
+        self.assertEqual(order.get_subtotal(), 2.30)
+
+    def test_write_receipt(self):
+        order = Order()
+        item = Blizzard()
+        item.set_base(BlizzardFlavor.VANILLA)
+        item.add_topping(BlizzardTopping.CARAMEL)
+        order.add_item(item)
+        order.add_item(Drink(Size.SMALL))
+        out = io.StringIO()
+        self.assertEqual(order.write_receipt(out), 3)
+        self.assertEqual(out.getvalue(), order.get_receipt())
+        self.assertEqual(out.getvalue().splitlines()[1], "1: Base - Vanilla Bean, Toppings - Caramel Sauce, Price - $3.5")
+
+    def test_item_ids(self):
+        order = Order()
+        ids = [order.add_item(Drink(size)) for size in (Size.SMALL, Size.MEDIUM, Size.LARGE, Size.MEGA)]
+        self.assertEqual(order.get_item_ids(), ids)
+        order.remove_item_by_id(ids[1])
+        self.assertEqual(order.get_item(ids[2]).get_size(), Size.LARGE)
+        with self.assertRaises(KeyError):
+            order.remove_items_by_id([ids[0], ids[1]])
+        self.assertEqual(order.get_total(), 3)
+        order.remove_items_by_id([ids[3], ids[0]])
+        self.assertEqual(order.get_item_ids(), [ids[2]])
+        self.assertEqual(order.get_subtotal_cents(), 205)
+        self.assertNotIn(order.add_item(Drink(Size.SMALL)), ids)
+
+    def test_dropped_orders(self):
+        item = Food()
+        item.set_base(Foods.FRIES)
+        orders = [Order() for _ in range(100)]
+        for order in orders:
+            order.add_item(item)
+            order.add_item(item)
+        kept = orders[0]
+        del orders, order
+        self.assertEqual(item._orders, {kept._store: 2})
+        item.add_topping(Topping.CHILI)
+        self.assertEqual(kept.get_subtotal_cents(), 2 * 210)
+        del kept
+        self.assertIsNone(item._orders)
+
+    def test_loader(self):
+        order = Order()
+        item = Blizzard()
+        item.set_base(BlizzardFlavor.MINT_CHIP)
+        item.add_topping(BlizzardTopping.PECANS)
+        order.add_item(item)
+        item = Drink(Size.MEDIUM)
+        item.set_base("Dr. Pepper")
+        item.add_flavor("Cherry")
+        order.add_item(item)
+        stream = io.StringIO()
+        dump_orders([order, order], stream)
+        stream.write('{"items": [{"kind": "drink", "size": "Huge"}]}\n')
+        stream.write('{"items": [{"kind": ["food"]}]}\n')
+        dump_orders([order], stream)
+        stream.seek(0)
+
+        loader = OrderLoader(workers=0, chunk_size=2)
+        results = list(loader.load(stream))
+        self.assertEqual([result.get_receipt() for result in results[:2]], [order.get_receipt()] * 2)
+        self.assertIsInstance(results[2], LineError)
+        self.assertEqual(results[2].line, 3)
+        self.assertEqual(results[3].line, 4)
+        self.assertEqual(results[4].get_receipt(), order.get_receipt())
+        self.assertEqual((loader.stats.orders, loader.stats.errors), (3, 2))
+
+        # Workers send orders back as batches; the errors must land in the same places.
+        stream.seek(0)
+        pooled = list(OrderLoader(workers=1, chunk_size=3).load(stream))
+        def describe(result):
+            return result.line if isinstance(result, LineError) else (result.get_receipt(), result.get_subtotal_cents())
+        self.assertEqual([describe(result) for result in pooled], [describe(result) for result in results])
+
+    def test_settle(self):
+        orders = []
+        for store, base in enumerate(list(Foods)[1:]):
+            order = Order()
+            item = Food()
+            item.set_base(base)
+            item.add_topping(Topping.CHOCOLATE)
+            order.add_item(item)
+            order.add_item(Drink(Size.SMALL))
+            orders.append((store % 3, order))
+        expected = Settlement()
+        for store, order in orders:
+            expected.add(store, order)
+
+        self.assertEqual(settle(orders, workers=0, shard_size=2), expected)
+        self.assertEqual(settle(orders, workers=1), expected)
+        self.assertEqual(expected.kinds["drink"], [7, 7 * 150])
+        self.assertEqual(expected.get_total_cents(), sum(order.get_subtotal_cents() for _, order in orders))
+
+        # Workers price with this process's prices, however they were started.
+        prices = pricing.get_prices()
+        table = pricing.TABLES["drink.size"]
+        table.set_price(Size.SMALL, 175)
+        try:
+            self.assertEqual(settle(orders, workers=1).kinds["drink"], [7, 7 * 175])
+            changed = pricing.get_prices()
+            pricing.set_prices(prices)
+            self.assertEqual(table.price(Size.SMALL), 150)
+            pricing.set_prices(changed)
+            self.assertEqual(table.price(Size.SMALL), 175)
+        finally:
+            pricing.set_prices(prices)
+
+    def test_archive(self):
+        orders = []
+        for base in list(Foods)[1:]:
+            order = Order()
+            item = Food()
+            item.set_base(base)
+            item.set_toppings([Topping.KETCHUP, Topping.CHILI])
+            order.add_item(item)
+            item = Drink(Size.LARGE)
+            item.set_base("Sprite")
+            item.add_flavor("Lime")
+            order.add_item(item)
+            orders.append(order)
+        orders.append(Order())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "orders.bin")
+            write_archive(path, orders)
+            with ArchiveReader(path) as archive:
+                self.assertEqual((len(archive), archive.get_num_items()), (len(orders), 2 * (len(orders) - 1)))
+                self.assertEqual(archive[3].get_receipt(), orders[3].get_receipt())
+                self.assertEqual(archive.get_order_cents(1), orders[1].get_subtotal_cents())
+                self.assertEqual(list(archive.iter_items(len(orders) - 1)), [])
+                self.assertEqual(archive.to_batch().get_total_cents(), sum(order.get_subtotal_cents() for order in orders))
+                with self.assertRaises(IndexError):
+                    archive.get_order(len(orders))
+
+    def test_intake(self):
+        async def run():
+            async with IntakeService(max_queue=4, max_batch=8, max_wait=0.001) as service:
+                records = [{"items": [{"kind": "drink", "size": "Small", "flavors": ["Lime"]}]}] * 20
+                receipts = await asyncio.gather(*(service.submit(record) for record in records))
+                with self.assertRaises(ValueError):
+                    await service.submit({"items": [{"kind": "food", "base": "Pizza"}]})
+                with self.assertRaises(Exception):
+                    await service.submit({"items": [{"kind": ["food"]}]})
+                receipts.append(await asyncio.wait_for(service.submit(records[0]), 5))
+                return receipts, service.metrics
+
+        receipts, metrics = asyncio.run(run())
+        self.assertEqual(receipts[0], "Your order receipt:\n1: Base - None, Flavors - Lime, Price - $1.65\n")
+        self.assertEqual(receipts[-1], receipts[0])
+        self.assertEqual((metrics.completed, metrics.failed), (21, 2))
+        self.assertLessEqual(max(metrics.batch_sizes), 8)
+        self.assertLessEqual(metrics.max_queue_depth, 4)
+
+    def test_instrument(self):
+        original = Food.set_base
+        instrument.reset()
+        instrument.enable()
+        try:
+            item = Food()
+            item.set_base(Foods.TOTS)
+            item.set_base(Foods.FRIES)
+        finally:
+            instrument.disable()
+        self.assertIs(Food.set_base, original)
+        stats = instrument.snapshot()["Food.set_base"]
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(stats["buckets"]["+Inf"], 2)
+        self.assertIn('api_method_duration_seconds_count{method="Food.set_base"} 2', instrument.to_prometheus())
+
+    def test_rollup(self):
+        orders = []
+        for base in list(Foods)[1:]:
+            order = Order()
+            item = Food()
+            item.set_base(base)
+            item.add_topping(Topping.CHEESE)
+            order.add_item(item)
+            item = Drink(Size.MEGA)
+            item.add_flavor("Mint")
+            order.add_item(item)
+            order.add_item(Drink(Size.SMALL))
+            orders.append(order)
+        rollup = SalesRollup().add_orders(iter(orders))
+        self.assertEqual((rollup.orders, rollup.get_total_cents()), (7, sum(order.get_subtotal_cents() for order in orders)))
+        self.assertEqual(rollup.get_attach_rate(KIND_FOOD, Topping.CHEESE), 1.0)
+        self.assertEqual(rollup.get_attach_rate(KIND_DRINK, "Mint"), 0.5)
+        self.assertEqual(rollup.to_dict()["kinds"]["drink"]["sizes"], {"Small": (7, 7 * 150), "Mega": (7, 7 * 230)})
+        with self.assertRaises(ValueError):
+            rollup.get_attach_rate(KIND_DRINK, Topping.CHEESE)
+
+        first, second = SalesRollup(), SalesRollup()
+        first.add_batch(OrderBatch.from_orders(orders[:3]))
+        second.add_orders(orders[3:])
+        self.assertEqual(first.merge(second), rollup)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, f"{day}.bin") for day in range(2)]
+            write_archive(paths[0], orders[:4])
+            write_archive(paths[1], orders[4:])
+            self.assertEqual(rollup_archives(paths, workers=0), rollup)
+
+    def test_registry(self):
+        registry = OrderRegistry(shards=4)
+        item = Food()
+        item.set_base(Foods.FRIES)
+        frozen = item.freeze()
+
+        def register():
+            for _ in range(200):
+                order_id = registry.register()
+                registry.add_item(order_id, frozen)
+                registry.add_item(order_id, frozen)
+
+        threads = [threading.Thread(target=register) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(registry), 800)
+
+        ids, batch = registry.snapshot()
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(batch.get_total_cents(), 800 * 300)
+        with registry.edit(ids[0]) as order:
+            order.thaw_item(1).add_topping(Topping.CHILI)
+        self.assertEqual(registry.get_subtotal_cents(ids[0]), 360)
+        self.assertEqual(batch.get_order_cents(0), 300)
+        registry.remove(ids[0])
+        with self.assertRaises(KeyError):
+            registry.get_receipt(ids[0])
+
+        # A mutable item shared across shards is frozen on the way in, so changing it reaches neither order.
+        first, second = registry.register(), registry.register()
+        registry.add_item(first, item)
+        registry.add_item(second, item)
+        order = Order()
+        order.add_item(item)
+        third = registry.register(order)
+        item.add_topping(Topping.CHILI)
+        self.assertIs(item._orders, order._store)
+        self.assertEqual([registry.get_subtotal_cents(order_id) for order_id in (first, second, third)], [150] * 3)
+        self.assertEqual(order.get_subtotal_cents(), 210)
+
+    def test_scheduler(self):
+        scheduler = KitchenScheduler(clock=lambda: 0.0)
+        first = Order()
+        item = Food()
+        item.set_base(Foods.FRIES)
+        first.add_item(item)
+        first.add_item(Drink(Size.SMALL))
+        second = Order()
+        item = Food()
+        item.set_base(Foods.TOTS)
+        second.add_item(item)
+        cancelled = Order()
+        cancelled.add_item(Drink(Size.MEGA))
+        first_id = scheduler.submit(first, now=0)
+        second_id = scheduler.submit(second, now=10)
+        scheduler.cancel(scheduler.submit(cancelled, now=20))
+        unrouted = Order()
+        unrouted.add_item(Food())
+        with self.assertRaises(ValueError):
+            scheduler.submit(unrouted)
+        with self.assertRaises(ValueError):
+            scheduler.submit(Order())
+
+        ticket = scheduler.next_ticket("fryer", now=30)
+        self.assertEqual((ticket.order_id, ticket.prep), (first_id, 180))
+        self.assertFalse(scheduler.complete(ticket, now=210))
+        # Started so it is ready with the fries, which take 165 seconds longer.
+        drink = scheduler.next_ticket("fountain", now=210)
+        self.assertEqual((drink.order_id, drink.start_by), (first_id, 165))
+        self.assertIsNone(scheduler.next_ticket("fountain"))
+        self.assertTrue(scheduler.complete(drink, now=225))
+        self.assertEqual(scheduler.next_ticket("fryer", now=225).order_id, second_id)
+        self.assertEqual((scheduler.orders_completed, scheduler.mean_lead_time()), (1, 225))
+        self.assertEqual(scheduler.metrics["fryer"].max_wait, 215)
+
+    def test_journal(self):
+        orders = []
+        for base in (Foods.HOT_DOG, Foods.NACHOS, Foods.TOTS):
+            order = Order()
+            item = Food()
+            item.set_base(base)
+            order.add_item(item)
+            order.add_item(Drink(Size.MEDIUM))
+            orders.append(order)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "orders.journal")
+            with Journal(path, max_batch=2, max_delay=0.01, sync=False) as journal:
+                keys = [journal.append(order) for order in orders]
+                journal.remove(keys[1], wait=False)
+            self.assertEqual(journal.stats.records, 4)
+
+            with open(path, "ab") as fp:
+                fp.write(b"\x40\x00\x00\x00torn")
+            with Journal(path, sync=False) as journal:
+                self.assertEqual(sorted(journal.recovered), [keys[0], keys[2]])
+                self.assertEqual(journal.recovered[keys[2]].get_receipt(), orders[2].get_receipt())
+                self.assertEqual(journal.append(orders[1]), keys[2] + 1)
+            recovered, valid, last_key = replay(path)
+            self.assertEqual((len(recovered), valid, last_key), (3, os.path.getsize(path), keys[2] + 1))
+            with self.assertRaises(ValueError):
+                journal.append(orders[0])
+
+            # Keys are never reused: not after an explicit key, nor after a removal and a restart.
+            path = os.path.join(directory, "keys.journal")
+            with Journal(path, sync=False) as journal:
+                self.assertEqual(journal.append(orders[0], key=2), 2)
+                self.assertEqual([journal.append(orders[1]), journal.append(orders[2])], [3, 4])
+                journal.remove(4)
+            with Journal(path, sync=False) as journal:
+                self.assertEqual(sorted(journal.recovered), [2, 3])
+                self.assertEqual(journal.append(orders[2]), 5)
+
+    def test_loadgen(self):
+        mix = TrafficMix(kinds={"drink": 1}, sizes={Size.MEGA: 1}, max_open=4)
+        trace = LoadGenerator(mix, seed=7).generate(500)
+        self.assertEqual(trace, LoadGenerator(mix, seed=7).generate(500))
+        added = [op["item"] for op in trace if op["op"] == "add"]
+        self.assertTrue(added)
+        self.assertTrue(all(item["kind"] == "drink" and item["size"] == "Mega" for item in added))
+
+        fp = io.StringIO()
+        save_trace(trace, fp, rate=None)
+        fp.seek(0)
+        self.assertEqual(load_trace(fp), (trace, None))
+
+        report = run_trace(trace)
+        self.assertEqual(report.get_count(), 500)
+        self.assertEqual(report.get_count("add"), len(added))
+        self.assertLessEqual(report.percentile(50), report.percentile(99))
+        self.assertEqual(report.summary()["all"]["count"], 500)
+        with self.assertRaises(ValueError):
+            TrafficMix(operations={"refund": 1})
+        with self.assertRaises(ValueError):
+            TrafficMix(kinds={"food": 0})
+
+    def test_fork(self):
+        order = Order()
+        item = Food()
+        item.set_base(Foods.HOT_DOG)
+        hot_dog = order.add_item(item)
+        drink = order.add_item(Drink(Size.LARGE))
+        receipt = order.get_receipt()
+
+        held = order.snapshot()
+        repeat = order.fork()
+        self.assertIs(repeat.get_item(hot_dog), item.freeze())
+        item.add_topping(Topping.KETCHUP)
+        self.assertEqual((repeat.get_item(hot_dog).get_toppings(), repeat.get_subtotal_cents()), ([], 435))
+        repeat.edit_item(hot_dog).add_topping(Topping.CHILI)
+        self.assertEqual((item.get_toppings(), order.get_subtotal_cents()), (["Ketchup"], 435))
+        self.assertIs(repeat.get_item(drink), order.get_item(drink).freeze())
+        repeat.remove_item_by_id(drink)
+        self.assertEqual((repeat.get_total(), repeat.get_subtotal_cents()), (1, 290))
+
+        order.edit_item(hot_dog).add_topping(Topping.BACON)
+        order.add_item(Drink(Size.SMALL))
+        order.get_item(drink).add_flavor("Mint")
+        self.assertEqual(order.get_subtotal_cents(), 260 + 220 + 150)
+        self.assertEqual(held.get_receipt(), receipt)
+        self.assertEqual(held.get_subtotal_cents(), 435)
+        held.edit_item(drink).add_flavor("Lime")
+        self.assertEqual((held.get_subtotal_cents(), order.get_subtotal_cents()), (450, 630))
+
+        # Thrown-away forks leave no back-references behind.
+        item = order.get_item(drink)
+        for _ in range(100):
+            order.fork().add_item(Drink(Size.SMALL))
+            repeat = order.fork()
+            repeat.add_item(Drink(Size.SMALL))
+        del repeat
+        self.assertIs(item._orders, order._store)
+        copy.copy(order)
+        item.add_flavor("Lime")
+        self.assertEqual(order.get_subtotal_cents(), 260 + 220 + 165)
+
+    def test_price_index(self):
+        item = Food()
+        item.set_base(Foods.NACHOS)
+        item.set_toppings([Topping.CHEESE, Topping.CHILI])
+        index = price_index(Food._price_tables)
+        self.assertIs(price_index(Food._price_tables), index)
+        self.assertEqual(index.price(*item._encode()), item.calculate_cost_cents())
+
+        table = pricing.TABLES["food.topping"]
+        table.set_price(Topping.CHEESE, 40)
+        try:
+            self.assertEqual(price_index(Food._price_tables).price(*item._encode()), 290)
+        finally:
+            table.set_price(Topping.CHEESE, 30)
+        self.assertEqual(price_index(Food._price_tables).fingerprint, index.fingerprint)
+        with self.assertRaises(ValueError):
+            pricing.PriceTable("food.base", Foods, {Foods.FRIES: 999})
+        self.assertEqual(pricing.TABLES["food.base"].price(Foods.FRIES), 150)
+
+        fries = Food()
+        fries.set_base(Foods.FRIES)
+        frozen = fries.freeze()
+        order = Order()
+        order.add_item(fries)
+        order.add_item(frozen)
+        ketchup = Food()
+        ketchup.set_base(Foods.FRIES)
+        ketchup.add_topping(Topping.KETCHUP)
+        ketchup.freeze()
+        table = pricing.TABLES["food.base"]
+        table.set_price(Foods.FRIES, 999)
+        try:
+            self.assertEqual(list(price_many([frozen, fries])), [999, 999])
+            self.assertEqual(fries.freeze().calculate_cost_cents(), 999)
+            self.assertEqual(fries.calculate_cost_cents(), 999)
+            self.assertEqual(frozen.thaw().calculate_cost_cents(), 999)
+            self.assertEqual(order.get_subtotal_cents(), 2 * 999)
+            self.assertEqual(list(OrderBatch.from_orders([order]).cents), list(price_many(order.get_items())))
+            self.assertEqual(order.snapshot().get_subtotal_cents(), 2 * 999)
+            # A copy of an item frozen before the change must not carry the old price.
+            fresh = Order()
+            item = Food()
+            item.set_base(Foods.FRIES)
+            item.add_topping(Topping.KETCHUP)
+            ketchup_id = fresh.add_item(item)
+            held = fresh.snapshot()
+            held.edit_item(ketchup_id).add_topping(Topping.CHILI)
+            self.assertEqual(held.get_subtotal_cents(), 999 + 60)
+        finally:
+            table.set_price(Foods.FRIES, 150)
+        self.assertEqual(order.get_subtotal_cents(), 300)
+
+        cache_dir = pricing.CACHE_DIR
+        with tempfile.TemporaryDirectory() as directory:
+            pricing.CACHE_DIR = directory
+            try:
+                built = PriceIndex(Drink._price_tables)
+                self.assertTrue(os.path.exists(os.path.join(directory, f"prices-{built.fingerprint}.bin")))
+                self.assertEqual(PriceIndex(Drink._price_tables).cents, built.cents)
+            finally:
+                pricing.CACHE_DIR = cache_dir
+
+    def test_frozen_items(self):
+        item = Food()
+        item.set_base(Foods.CORN_DOG)
+        item.add_topping(Topping.MUSTARD)
+        frozen = item.freeze()
+        self.assertIs(frozen, item.freeze())
+        self.assertIs(frozen.freeze(), frozen)
+        self.assertIsNot(Drink(Size.SMALL).freeze(), Drink(Size.MEDIUM).freeze())
+        with self.assertRaises(TypeError):
+            frozen.add_topping(Topping.CHILI)
+
+        order = Order()
+        item_id = order.add_item(frozen)
+        order.add_item(frozen)
+        self.assertEqual(order.get_subtotal_cents(), 400)
+        thawed = order.thaw_item(item_id)
+        thawed.add_topping(Topping.CHILI)
+        self.assertEqual(order.get_subtotal_cents(), 460)
+        self.assertIs(order.get_item(item_id), thawed)
+        self.assertEqual(frozen.get_toppings(), ["Mustard"])
+        self.assertEqual(OrderBatch.from_orders([order]).get_order(0).get_receipt(), order.get_receipt())
+
+    def test_lazy_import(self):
+        # A fresh interpreter, since this one has already imported everything.
+        script = (
+            "import sys, api\n"
+            "print(sorted(name for name in sys.modules if name.startswith('api.')))\n"
+            "api.Order\n"
+            "print('api.orders' in sys.modules, 'api.loader' in sys.modules, 'unittest' in sys.modules)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.splitlines(), ["[]", "True False False"])
+
+    def test_drink_validation(self):
+        item = Drink("small")
+        self.assertIs(item.get_size(), Size.SMALL)
+        item.set_size("LARGE")
+        item.set_base("COCA-COLA")
+        item.add_flavor("sTrAwBeRrY")
+        self.assertEqual((item.get_size(), item.get_base(), item.get_flavors()), (Size.LARGE, "Coca-Cola", ["Strawberry"]))
+        self.assertEqual(item.calculate_cost(), 2.20)
+        with self.assertRaises(ValueError):
+            Drink("Huge")
+        with self.assertRaises(ValueError):
+            item.set_size(Size.NULL)
+
 test = MethodTests()
 test.test_order()